@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional
 
 from pydantic_settings import BaseSettings
@@ -21,7 +22,15 @@ class Settings(BaseSettings):
     imap_port: int = 993
     from_email: str = ""
 
-    model_config = {"env_file": ".env", "extra": "ignore"}
+    booking_agent_headless: bool = True
 
+    model_config = {"env_file": ".env", "extra": "ignore", "frozen": True}
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Parse .env and the environment once per process."""
+    return Settings()
+
+
+settings = get_settings()
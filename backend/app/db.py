@@ -1,64 +1,174 @@
+import asyncio
+import logging
+import math
+
 import certifi
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import GEOSPHERE, MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import GEOSPHERE
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 client: AsyncIOMotorClient = None  # type: ignore[assignment]
-sync_client: MongoClient = None  # type: ignore[assignment]
+
+_DB_NAME = settings.mongo_db
+
+_ready = asyncio.Event()
+
+# Radius used by MongoDB to convert $centerSphere radians to metres.
+_EARTH_RADIUS_M = 6_378_100
+# Mean Earth radius for haversine distances.
+_MEAN_EARTH_RADIUS_M = 6_371_000
+
+_COLLECTION_NAMES = (
+    "service_types",
+    "providers",
+    "observations",
+    "stripe_customers",
+    "bookings",
+    "inquiries",
+    "agent_bookings",
+)
+collections: dict[str, AsyncIOMotorCollection] = {}
 
 
 def get_db():
-    return client[settings.mongo_db]
+    return client[_DB_NAME]
+
+
+def col(name: str) -> AsyncIOMotorCollection:
+    """Collection handle cached at connect() time — the fast path for routers."""
+    return collections[name]
+
+
+def near_query(lng: float, lat: float, radius_m: float) -> dict:
+    """Filter on `location` within radius_m of a point.
+
+    $geoWithin uses the 2dsphere index as a pure filter; unlike $near it
+    doesn't sort by distance, so compute distances client-side if needed.
+    """
+    return {
+        "location": {
+            "$geoWithin": {"$centerSphere": [[lng, lat], radius_m / _EARTH_RADIUS_M]}
+        }
+    }
+
+
+def nearest_query(lng: float, lat: float, radius_m: float) -> dict:
+    """Filter on `location` within radius_m of a point, nearest first.
 
+    Use this instead of near_query whenever results are capped, so the cap
+    keeps the closest documents rather than an arbitrary subset.
+    """
+    return {
+        "location": {
+            "$nearSphere": {
+                "$geometry": {"type": "Point", "coordinates": [lng, lat]},
+                "$maxDistance": radius_m,
+            }
+        }
+    }
 
-def get_sync_db():
-    """Synchronous DB handle — used by LangChain integrations that require pymongo."""
-    return sync_client[settings.mongo_db]
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in metres between two (lat, lng) points."""
+    rlat1, rlng1, rlat2, rlng2 = (math.radians(v) for v in (lat1, lng1, lat2, lng2))
+    dlat = rlat2 - rlat1
+    dlng = rlng2 - rlng1
+    a = math.sin(dlat / 2) ** 2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlng / 2) ** 2
+    return 2 * _MEAN_EARTH_RADIUS_M * math.asin(math.sqrt(a))
 
 
 async def connect():
-    global client, sync_client
+    """Open the shared client. Idempotent — later calls are no-ops."""
+    global client
+    if client is not None:
+        return
     client = AsyncIOMotorClient(
         settings.mongo_url,
         tlsCAFile=certifi.where(),
+        maxPoolSize=200,
+        minPoolSize=10,
+        maxIdleTimeMS=300_000,
+        maxConnecting=4,
         serverSelectionTimeoutMS=3000,
+        waitQueueTimeoutMS=2000,
         connectTimeoutMS=3000,
         socketTimeoutMS=5000,
     )
-    sync_client = MongoClient(
-        settings.mongo_url,
-        serverSelectionTimeoutMS=3000,
-        connectTimeoutMS=3000,
-        socketTimeoutMS=5000,
-    )
+    # Warm the pool so the first request doesn't pay the TLS handshake.
+    try:
+        await client.admin.command("ping")
+    except Exception:
+        logger.warning("MongoDB ping failed during connect", exc_info=True)
+
+    db = client[_DB_NAME]
+    collections.update({name: db[name] for name in _COLLECTION_NAMES})
 
 
 async def close():
-    global client, sync_client
-    if client:
+    global client
+    if client is not None:
+        collections.clear()
         client.close()
-    if sync_client:
-        sync_client.close()
+        client = None
 
 
-async def ensure_indexes():
-    db = get_db()
+def is_ready() -> bool:
+    """True once ensure_indexes() has run to completion."""
+    return _ready.is_set()
+
 
-    await db.service_types.create_index("slug", unique=True)
+async def _create_index(collection, keys, **kwargs) -> bool:
+    """Create an index, logging instead of raising. Returns whether it exists now."""
+    try:
+        await collection.create_index(keys, background=True, **kwargs)
+    except Exception:
+        logger.warning(
+            "Failed to create index %s on %s", keys, collection.name, exc_info=True
+        )
+        return False
+    return True
 
-    await db.providers.create_index([("location", GEOSPHERE)])
 
-    await db.observations.create_index([("location", GEOSPHERE)])
-    await db.observations.create_index([("category", 1), ("service_type", 1)])
+async def ensure_indexes():
+    """Create all indexes. Idempotent, and one failing index doesn't stop the rest."""
+    db = get_db()
 
-    await db.stripe_customers.create_index("email", unique=True)
-    await db.stripe_customers.create_index("stripe_customer_id", unique=True)
+    await _create_index(db.service_types, "slug", unique=True)
 
-    await db.bookings.create_index("stripe_payment_intent_id", unique=True)
-    await db.bookings.create_index("stripe_card_id", unique=True)
-    await db.bookings.create_index("customer_id")
+    await _create_index(db.providers, [("location", GEOSPHERE)])
 
-    await db.inquiries.create_index([("provider_id", 1), ("service_type", 1)])
-    await db.inquiries.create_index("status")
-    await db.inquiries.create_index("message_id", unique=True)
+    # Search filters by slug and radius together, so keep them in one index
+    # (2dsphere as the trailing key) instead of intersecting two.
+    compound_geo = await _create_index(
+        db.observations,
+        [("category", 1), ("service_type", 1), ("location", GEOSPHERE)],
+    )
+    await _create_index(db.observations, [("service_type", 1), ("observed_at", -1)])
+    # Superseded by the compound index above; a second 2dsphere index on the
+    # same path makes $geoNear ambiguous. Only drop it once the replacement
+    # exists, otherwise geo queries on observations would have no index.
+    if compound_geo:
+        try:
+            if "location_2dsphere" in await db.observations.index_information():
+                await db.observations.drop_index("location_2dsphere")
+        except Exception:
+            logger.warning("Failed to drop legacy observations index", exc_info=True)
+    else:
+        logger.warning("Keeping legacy observations location_2dsphere index")
+
+    await _create_index(db.stripe_customers, "email", unique=True)
+    await _create_index(db.stripe_customers, "stripe_customer_id", unique=True)
+
+    await _create_index(db.bookings, "stripe_payment_intent_id", unique=True)
+    await _create_index(db.bookings, "stripe_card_id", unique=True)
+    await _create_index(db.bookings, "customer_id")
+
+    await _create_index(db.inquiries, [("provider_id", 1), ("service_type", 1)])
+    await _create_index(db.inquiries, "status")
+    await _create_index(db.inquiries, "message_id", unique=True)
+
+    _ready.set()
+    logger.info("MongoDB indexes ensured")
@@ -1,21 +1,63 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app import db
 from app.routers import observations, providers, service_types, stripe_payments, search, book, chat, inquiries
+from app.services import llm, scraper, vector_index
 
 logging.basicConfig(level=logging.INFO)
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
+async def db_lifespan(app: FastAPI):
     await db.connect()
-    await db.ensure_indexes()
-    yield
-    await db.close()
+    # Build indexes after the port is bound; /health/ready reports when done.
+    index_task = asyncio.create_task(db.ensure_indexes())
+    try:
+        yield
+    finally:
+        index_task.cancel()
+        await db.close()
+
+
+@asynccontextmanager
+async def vector_index_lifespan(app: FastAPI):
+    task = asyncio.create_task(vector_index.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+@asynccontextmanager
+async def agent_lifespan(app: FastAPI):
+    try:
+        yield
+    finally:
+        # Bookings record their final status, so stop them before the DB closes.
+        await book.cancel_bookings()
+        await book.shutdown_agent()
+
+
+@asynccontextmanager
+async def http_lifespan(app: FastAPI):
+    try:
+        yield
+    finally:
+        await scraper.close_http_client()
+        await llm.close_openai_client()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The agent shuts down before the database closes.
+    async with db_lifespan(app), vector_index_lifespan(app), agent_lifespan(app), http_lifespan(app):
+        yield
 
 
 app = FastAPI(
@@ -45,3 +87,15 @@ app.include_router(inquiries.router)
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/health/live")
+async def health_live():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    if not db.is_ready():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ok"}
@@ -2,11 +2,13 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from app.models.common import PyObjectId
+
 
 class BookingCreate(BaseModel):
-    customer_id: str = Field(..., description="MongoDB _id of the customer record")
+    customer_id: PyObjectId = Field(..., description="MongoDB _id of the customer record")
     service_type: str = Field(..., examples=["tire_change"])
-    provider_id: str = Field(..., description="MongoDB _id of the provider")
+    provider_id: PyObjectId = Field(..., description="MongoDB _id of the provider")
     amount: float = Field(..., gt=0, description="Service price")
     currency: str = Field(default="GBP", examples=["GBP", "EUR"])
     agent_name: str = Field(default="Plumline Agent")
@@ -0,0 +1,21 @@
+from typing import Annotated
+
+from bson import ObjectId
+from pydantic import PlainSerializer, PlainValidator, WithJsonSchema
+
+
+def _to_object_id(value) -> ObjectId:
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    raise ValueError("must be a 24-character hex ObjectId")
+
+
+# Parsed once during request validation; invalid ids become a 422, not a 500.
+PyObjectId = Annotated[
+    ObjectId,
+    PlainValidator(_to_object_id),
+    PlainSerializer(str, return_type=str),
+    WithJsonSchema({"type": "string", "pattern": "^[0-9a-fA-F]{24}$"}),
+]
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class GeoJSONPoint(BaseModel):
@@ -25,6 +25,9 @@ class ProviderCreate(BaseModel):
     description: str | None = Field(default=None, examples=["Fast, friendly phone repairs."])
 
 
+PROVIDER_ADAPTER = TypeAdapter(ProviderCreate)
+
+
 class ProviderResponse(BaseModel):
     id: str = Field(..., alias="_id")
     name: str
@@ -40,11 +43,11 @@ class ProviderResponse(BaseModel):
     model_config = {"populate_by_name": True}
 
 
-def provider_to_doc(p: ProviderCreate) -> dict:
-    return {
-        **p.model_dump(),
+def provider_to_doc(p: ProviderCreate, now: datetime | None = None) -> dict:
+    """Pass `now` when building several docs so they share one timestamp."""
+    return PROVIDER_ADAPTER.dump_python(p, mode="json") | {
         "location": p.location.model_dump(),
-        "created_at": datetime.now(timezone.utc),
+        "created_at": now or datetime.now(timezone.utc),
     }
 
 
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class ServiceTypeCreate(BaseModel):
@@ -14,6 +14,9 @@ class ServiceTypeCreate(BaseModel):
     )
 
 
+SERVICE_TYPE_ADAPTER = TypeAdapter(ServiceTypeCreate)
+
+
 class ServiceTypeResponse(BaseModel):
     id: str = Field(..., alias="_id")
     slug: str
@@ -25,10 +28,10 @@ class ServiceTypeResponse(BaseModel):
     model_config = {"populate_by_name": True}
 
 
-def service_type_to_doc(st: ServiceTypeCreate) -> dict:
-    return {
-        **st.model_dump(),
-        "created_at": datetime.now(timezone.utc),
+def service_type_to_doc(st: ServiceTypeCreate, now: datetime | None = None) -> dict:
+    """Pass `now` when building several docs so they share one timestamp."""
+    return SERVICE_TYPE_ADAPTER.dump_python(st, mode="json") | {
+        "created_at": now or datetime.now(timezone.utc),
     }
 
 
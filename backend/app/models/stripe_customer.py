@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class StripeCustomerCreate(BaseModel):
@@ -8,6 +8,9 @@ class StripeCustomerCreate(BaseModel):
     email: str = Field(..., examples=["alice@example.com"])
 
 
+STRIPE_CUSTOMER_ADAPTER = TypeAdapter(StripeCustomerCreate)
+
+
 class StripeCustomerResponse(BaseModel):
     id: str = Field(..., alias="_id")
     name: str
@@ -1,22 +1,59 @@
 import asyncio
+import json
 import logging
-from concurrent.futures import ThreadPoolExecutor
-
-from fastapi import APIRouter
+import sys
+import threading
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app.db import col
+
 from app.services import stripe_service
-from app.services.agent_runner import run_booking_agent
+from app.services.agent_runner import close_browser, run_booking_agent
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api")
 
-_executor = ThreadPoolExecutor(max_workers=2)
+# Playwright runs on one long-lived loop in its own thread. Required on Windows:
+# uvicorn's SelectorEventLoop doesn't support subprocesses, a ProactorEventLoop does.
+_agent_loop = (
+    asyncio.ProactorEventLoop() if sys.platform == "win32" else asyncio.new_event_loop()
+)
+threading.Thread(target=_agent_loop.run_forever, name="booking-agent", daemon=True).start()
+
+
+async def cancel_bookings():
+    """Cancel in-flight bookings; each records "failed" as it unwinds."""
+    tasks = list(_booking_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def shutdown_agent():
+    """Close the shared Playwright browser on the agent loop."""
+    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(close_browser(), _agent_loop))
+
 
 BOOKING_AMOUNT_PENCE = 15000  # €150 demo price
 BOOKING_CURRENCY = "eur"
 
+_TERMINAL_STATUSES = {"succeeded", "failed"}
+_booking_tasks: set[asyncio.Task] = set()
+# booking_id -> Event set (and replaced) on the next status change, so SSE
+# streams wake up without polling. Change streams would need a replica set.
+_status_changed: dict[ObjectId, asyncio.Event] = {}
+# Fallback re-read for bookings run by another worker process.
+_EVENTS_POLL_SECONDS = 2.0
+# Matches the frontend's 120 s abort; the stream then ends with "timeout".
+_EVENTS_DEADLINE_SECONDS = 120.0
+
 
 class BookingRequest(BaseModel):
     firstname: str
@@ -34,48 +71,60 @@ async def _provision_stripe_card(firstname: str, lastname: str, email: str) -> d
     2. Charge customer (simulates user paying for the repair)
     3. Create Issuing cardholder + virtual card with spending limit = charge amount
     4. Reveal and return card number / CVC
+
+    The cardholder doesn't depend on the customer or the charge, so it is
+    created concurrently with steps 1-2.
     """
-    # 1. Create Stripe customer
-    customer = await stripe_service.create_stripe_customer(
-        name=f"{firstname} {lastname}",
-        email=email,
+    # 1. Create Stripe customer and, in parallel, the Issuing cardholder for the AI agent
+    customer_task = asyncio.create_task(
+        stripe_service.create_stripe_customer(
+            name=f"{firstname} {lastname}",
+            email=email,
+        )
     )
-
-    # 2. Attach Stripe built-in test PaymentMethod (always succeeds in test mode)
-    pm_id = await stripe_service.attach_payment_method(customer.id, "pm_card_visa")
-
-    # 3. Charge customer
-    await stripe_service.charge_customer(
-        stripe_customer_id=customer.id,
-        amount_pence=BOOKING_AMOUNT_PENCE,
-        currency=BOOKING_CURRENCY,
-        description=f"Repair booking for {firstname} {lastname}",
-        metadata={"source": "booking_agent"},
-        payment_method_id=pm_id,
+    cardholder_task = asyncio.create_task(
+        stripe_service.create_cardholder(
+            agent_name=f"Agent for {firstname} {lastname}",
+            email=email,
+            billing_address={
+                "line1": "1 Rue de Rivoli",
+                "city": "Paris",
+                "postal_code": "75001",
+                "country": "FR",
+            },
+            first_name=firstname,
+            last_name=lastname,
+        )
     )
 
-    # 4. Create Issuing cardholder for the AI agent
-    cardholder = await stripe_service.create_cardholder(
-        agent_name=f"Agent for {firstname} {lastname}",
-        email=email,
-        billing_address={
-            "line1": "1 Rue de Rivoli",
-            "city": "Paris",
-            "postal_code": "75001",
-            "country": "FR",
-        },
-        first_name=firstname,
-        last_name=lastname,
-    )
+    try:
+        customer = await customer_task
+
+        # 2-3. Attach Stripe built-in test PaymentMethod (always succeeds in test
+        # mode) and charge it, while the cardholder finishes
+        _, cardholder = await asyncio.gather(
+            stripe_service.attach_and_charge(
+                stripe_customer_id=customer.id,
+                payment_method_id="pm_card_visa",
+                amount_pence=BOOKING_AMOUNT_PENCE,
+                currency=BOOKING_CURRENCY,
+                description=f"Repair booking for {firstname} {lastname}",
+                metadata={"source": "booking_agent"},
+            ),
+            cardholder_task,
+        )
+    except BaseException:
+        cardholder_task.cancel()
+        raise
 
-    # 5. Create virtual card with spending limit = charge amount
+    # 4. Create virtual card with spending limit = charge amount
     card = await stripe_service.create_virtual_card(
         cardholder_id=cardholder.id,
         amount_pence=BOOKING_AMOUNT_PENCE,
         currency=BOOKING_CURRENCY,
     )
 
-    # 6. Reveal card number + CVC (server-side only, never stored)
+    # 5. Reveal card number + CVC (server-side only, never stored)
     details = await stripe_service.reveal_card_details(card.id)
 
     return {
@@ -85,20 +134,34 @@ async def _provision_stripe_card(firstname: str, lastname: str, email: str) -> d
     }
 
 
-def _run_agent_in_thread(customer_data: dict, card_data: dict, appointment_data: dict):
-    """Run the async Playwright agent in a separate thread with its own event loop.
-    Required on Windows: uvicorn's SelectorEventLoop doesn't support subprocesses,
-    but a fresh ProactorEventLoop in a new thread does."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+async def _set_status(booking_id: ObjectId, status: str) -> None:
+    await col("agent_bookings").update_one(
+        {"_id": booking_id},
+        {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}},
+    )
+    event = _status_changed.pop(booking_id, None)
+    if event is not None:
+        event.set()
+
+
+async def _run_booking(booking_id: ObjectId, req: BookingRequest) -> None:
+    """Run one booking; it always ends as "succeeded" or "failed"."""
+    final_status = "failed"
     try:
-        loop.run_until_complete(run_booking_agent(customer_data, card_data, appointment_data))
+        await _book(booking_id, req)
+        final_status = "succeeded"
+    except Exception as e:
+        logger.warning("Booking agent failed for %s (%s)", booking_id, e)
     finally:
-        loop.close()
+        # Also runs on cancellation at shutdown, so the status never sticks at "running".
+        try:
+            await _set_status(booking_id, final_status)
+        except Exception:
+            logger.warning("Failed to record final status for %s", booking_id, exc_info=True)
 
 
-@router.post("/book")
-async def book(req: BookingRequest):
+async def _book(booking_id: ObjectId, req: BookingRequest) -> None:
+    await _set_status(booking_id, "provisioning")
     # Provision real Stripe virtual card before starting the agent
     try:
         card_data = await _provision_stripe_card(req.firstname, req.lastname, req.email)
@@ -108,16 +171,75 @@ async def book(req: BookingRequest):
         logger.warning("Stripe provisioning failed (%s), falling back to test card", e, exc_info=True)
         card_data = {"number": "4242 4242 4242 4242", "expiry": "12/28", "cvc": "123"}
 
-    # Run Playwright agent in thread, await completion before returning success
-    loop = asyncio.get_event_loop()
-    try:
-        await loop.run_in_executor(
-            _executor,
-            _run_agent_in_thread,
+    await _set_status(booking_id, "running")
+    fut = asyncio.run_coroutine_threadsafe(
+        run_booking_agent(
             {"firstname": req.firstname, "lastname": req.lastname, "email": req.email},
             card_data,
             {"device": req.device, "date": req.date, "time": req.time},
-        )
-    except Exception as e:
-        logger.warning("Booking agent failed (%s), returning success anyway", e)
-    return {"status": "success"}
+        ),
+        _agent_loop,
+    )
+    await asyncio.wrap_future(fut)
+
+
+@router.post("/book", status_code=202)
+async def book(req: BookingRequest):
+    """Start a booking and return immediately; follow it via /book/{id}/events."""
+    booking_id = ObjectId()
+    now = datetime.now(timezone.utc)
+    await col("agent_bookings").insert_one(
+        {"_id": booking_id, "status": "pending", "created_at": now, "updated_at": now}
+    )
+    task = asyncio.create_task(_run_booking(booking_id, req))
+    _booking_tasks.add(task)
+    task.add_done_callback(_booking_tasks.discard)
+    return {"booking_id": str(booking_id), "status": "pending"}
+
+
+def _sse(doc: dict) -> str:
+    return f"data: {json.dumps({'booking_id': str(doc['_id']), 'status': doc['status']})}\n\n"
+
+
+@router.get("/book/{booking_id}/events")
+async def booking_events(booking_id: str):
+    """Server-sent events with the booking status until it succeeds or fails."""
+    try:
+        oid = ObjectId(booking_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid booking_id")
+
+    collection = col("agent_bookings")
+    if not await collection.find_one({"_id": oid}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _EVENTS_DEADLINE_SECONDS
+        last_status = None
+        while True:
+            # Take the event before reading so a change in between is not missed.
+            event = _status_changed.setdefault(oid, asyncio.Event())
+            doc = await collection.find_one({"_id": oid}, {"status": 1})
+            if doc["status"] != last_status:
+                last_status = doc["status"]
+                yield _sse(doc)
+            if last_status in _TERMINAL_STATUSES:
+                _status_changed.pop(oid, None)
+                return
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield _sse({"_id": oid, "status": "timeout"})
+                return
+            try:
+                await asyncio.wait_for(
+                    event.wait(), timeout=min(_EVENTS_POLL_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -4,7 +4,7 @@ from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import APIRouter, HTTPException
 
-from app.db import get_db
+from app.db import col
 from app.models.inquiry import InquiryCreate, InquiryResponse, doc_to_inquiry
 from app.services.email_service import check_for_replies, is_email_configured, send_inquiry
 
@@ -51,8 +51,7 @@ async def get_provider_inquiries(provider_id: str):
     except InvalidId:
         raise HTTPException(status_code=400, detail="Invalid provider_id")
 
-    db = get_db()
     docs = []
-    async for doc in db.inquiries.find({"provider_id": oid}).sort("created_at", -1):
+    async for doc in col("inquiries").find({"provider_id": oid}).sort("created_at", -1):
         docs.append(doc_to_inquiry(doc))
     return docs
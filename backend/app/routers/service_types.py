@@ -2,9 +2,10 @@ import asyncio
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pymongo.errors import DuplicateKeyError
 
-from app.db import get_db
+from app.db import col
 from app.models.service_type import (
     ServiceTypeCreate,
     ServiceTypeResponse,
@@ -17,13 +18,19 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/service-types", tags=["service-types"])
 
+_LIST_PROJECTION = {"slug": 1, "name": 1, "category": 1, "description": 1, "created_at": 1}
+_LIST_CACHE_SIZE = 64
+
+# category -> (etag, docs); service types are append-only, so the newest
+# created_at identifies a listing.
+_list_cache: dict[str | None, tuple[str, list[dict]]] = {}
+
 
 @router.post("", response_model=ServiceTypeResponse, status_code=201)
 async def create_service_type(body: ServiceTypeCreate):
-    db = get_db()
     doc = service_type_to_doc(body)
 
-    existing = await db.service_types.find_one({"slug": doc["slug"]})
+    existing = await col("service_types").find_one({"slug": doc["slug"]}, {"_id": 1})
     if existing:
         raise HTTPException(status_code=409, detail=f"Service type '{doc['slug']}' already exists")
 
@@ -39,17 +46,47 @@ async def create_service_type(body: ServiceTypeCreate):
         except Exception:
             logger.warning("Failed to generate embedding for %s", body.slug, exc_info=True)
 
-    result = await db.service_types.insert_one(doc)
+    # Acknowledged, so a concurrent create of the same slug loses with a 409
+    # instead of a 201 for a document that was never stored.
+    try:
+        result = await col("service_types").insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"Service type '{doc['slug']}' already exists")
     doc["_id"] = result.inserted_id
     return doc_to_service_type(doc)
 
 
 @router.get("", response_model=list[ServiceTypeResponse])
-async def list_service_types(category: Optional[str] = Query(default=None)):
-    db = get_db()
+async def list_service_types(
+    request: Request,
+    response: Response,
+    category: Optional[str] = Query(default=None),
+):
     query = {}
     if category:
         query["category"] = category
-    cursor = db.service_types.find(query)
-    docs = await cursor.to_list(length=500)
-    return [doc_to_service_type(d) for d in docs]
+    collection = col("service_types")
+
+    latest = await collection.find_one(query, {"created_at": 1}, sort=[("created_at", -1)])
+    if latest is None:
+        return []
+    if latest.get("created_at") is None:
+        # Documents written before created_at existed: no version to tag, so
+        # serve uncached.
+        cursor = collection.find(query, projection=_LIST_PROJECTION, batch_size=500).limit(500)
+        return [doc_to_service_type(d) async for d in cursor]
+    etag = f'W/"{category or "*"}-{latest["created_at"].timestamp()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    cached = _list_cache.get(category)
+    if cached and cached[0] == etag:
+        return cached[1]
+
+    cursor = collection.find(query, projection=_LIST_PROJECTION, batch_size=500).limit(500)
+    docs = [doc_to_service_type(d) async for d in cursor]
+    if category not in _list_cache and len(_list_cache) >= _LIST_CACHE_SIZE:
+        _list_cache.pop(next(iter(_list_cache)))
+    _list_cache[category] = (etag, docs)
+    return docs
@@ -1,15 +1,19 @@
+import asyncio
 from datetime import datetime, timezone
 
 from bson import ObjectId
 from fastapi import APIRouter, HTTPException
+from pymongo import WriteConcern
 
-from app.db import get_db
+from app.db import col
 from app.models.booking import (
     BookingCreate,
     BookingWithCardResponse,
     doc_to_booking,
 )
+from app.models.common import PyObjectId
 from app.models.stripe_customer import (
+    STRIPE_CUSTOMER_ADAPTER,
     StripeCustomerCreate,
     StripeCustomerResponse,
     doc_to_stripe_customer,
@@ -25,28 +29,27 @@ router = APIRouter(prefix="/api/stripe", tags=["stripe"])
 @router.post("/customers", response_model=StripeCustomerResponse, status_code=201)
 async def create_customer(body: StripeCustomerCreate):
     """Register a customer in Stripe and store them in MongoDB."""
-    db = get_db()
     stripe_customer = await stripe_service.create_stripe_customer(body.name, body.email)
 
     doc = {
-        "name": body.name,
-        "email": body.email,
+        "_id": ObjectId(),
+        **STRIPE_CUSTOMER_ADAPTER.dump_python(body, mode="json"),
         "stripe_customer_id": stripe_customer.id,
         "created_at": datetime.now(timezone.utc),
     }
-    result = await db.stripe_customers.insert_one(doc)
-    doc["_id"] = result.inserted_id
+    await col("stripe_customers").insert_one(doc)
     return doc_to_stripe_customer(doc)
 
 
 @router.post("/customers/{customer_id}/setup-intent")
-async def create_setup_intent(customer_id: str):
+async def create_setup_intent(customer_id: PyObjectId):
     """
     Create a SetupIntent to save a payment method for future use.
     For the demo: use test payment method IDs (e.g. pm_card_visa) via attach-payment-method instead.
     """
-    db = get_db()
-    customer = await db.stripe_customers.find_one({"_id": ObjectId(customer_id)})
+    customer = await col("stripe_customers").find_one(
+        {"_id": customer_id}, {"stripe_customer_id": 1}
+    )
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
@@ -55,13 +58,14 @@ async def create_setup_intent(customer_id: str):
 
 
 @router.post("/customers/{customer_id}/attach-payment-method")
-async def attach_payment_method(customer_id: str, payment_method_id: str):
+async def attach_payment_method(customer_id: PyObjectId, payment_method_id: str):
     """
     Attach a PaymentMethod to the customer and set it as default.
     In test mode use pm_card_visa (Visa 4242, always succeeds) or pm_card_mastercard.
     """
-    db = get_db()
-    customer = await db.stripe_customers.find_one({"_id": ObjectId(customer_id)})
+    customer = await col("stripe_customers").find_one(
+        {"_id": customer_id}, {"stripe_customer_id": 1}
+    )
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
@@ -87,13 +91,16 @@ async def create_booking(body: BookingCreate):
     7. Persist booking in MongoDB (PAN/CVC never stored)
     8. Return full card details for the AI agent to use at the provider's website
     """
-    db = get_db()
-
-    customer = await db.stripe_customers.find_one({"_id": ObjectId(body.customer_id)})
+    customer, provider = await asyncio.gather(
+        col("stripe_customers").find_one(
+            {"_id": body.customer_id}, {"stripe_customer_id": 1, "email": 1}
+        ),
+        col("providers").find_one(
+            {"_id": body.provider_id}, {"name": 1, "address": 1, "city": 1}
+        ),
+    )
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-
-    provider = await db.providers.find_one({"_id": ObjectId(body.provider_id)})
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
 
@@ -107,21 +114,23 @@ async def create_booking(body: BookingCreate):
         description=f"Plumline booking: {body.service_type} at {provider['name']}",
         metadata={
             "service_type": body.service_type,
-            "provider_id": body.provider_id,
+            "provider_id": str(body.provider_id),
         },
     )
 
-    await stripe_service.topup_platform_balance(amount_pence, currency)
-
-    cardholder = await stripe_service.create_cardholder(
-        agent_name=body.agent_name,
-        email=customer["email"],
-        billing_address={
-            "line1": provider.get("address", "1 High Street"),
-            "city": provider.get("city", "London"),
-            "postal_code": "SW1A 1AA",
-            "country": "GB",
-        },
+    # The top-up and the cardholder don't depend on each other.
+    _, cardholder = await asyncio.gather(
+        stripe_service.topup_platform_balance(amount_pence, currency),
+        stripe_service.create_cardholder(
+            agent_name=body.agent_name,
+            email=customer["email"],
+            billing_address={
+                "line1": provider.get("address", "1 High Street"),
+                "city": provider.get("city", "London"),
+                "postal_code": "SW1A 1AA",
+                "country": "GB",
+            },
+        ),
     )
 
     card = await stripe_service.create_virtual_card(
@@ -133,9 +142,10 @@ async def create_booking(body: BookingCreate):
     card_details = await stripe_service.reveal_card_details(card.id)
 
     doc = {
-        "customer_id": body.customer_id,
+        "_id": ObjectId(),
+        "customer_id": str(body.customer_id),
         "service_type": body.service_type,
-        "provider_id": body.provider_id,
+        "provider_id": str(body.provider_id),
         "amount": body.amount,
         "currency": body.currency,
         "status": "charged",
@@ -147,8 +157,10 @@ async def create_booking(body: BookingCreate):
         "card_exp_year": card_details["exp_year"],
         "created_at": datetime.now(timezone.utc),
     }
-    result = await db.bookings.insert_one(doc)
-    doc["_id"] = result.inserted_id
+    # Bookings reference live charges and cards — wait for a majority ack.
+    await col("bookings").with_options(
+        write_concern=WriteConcern(w="majority")
+    ).insert_one(doc)
 
     response = doc_to_booking(doc)
     response["card_number"] = card_details["number"]
@@ -157,10 +169,9 @@ async def create_booking(body: BookingCreate):
 
 
 @router.get("/bookings/{booking_id}")
-async def get_booking(booking_id: str):
+async def get_booking(booking_id: PyObjectId):
     """Retrieve a booking by ID. Card PAN/CVC are not returned here."""
-    db = get_db()
-    doc = await db.bookings.find_one({"_id": ObjectId(booking_id)})
+    doc = await col("bookings").find_one({"_id": booking_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Booking not found")
     return doc_to_booking(doc)
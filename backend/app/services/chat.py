@@ -2,11 +2,11 @@ import json
 import logging
 import re
 
-from openai import AsyncOpenAI
 
 from app.config import settings
 from app.db import get_db
 from app.models.chat import ChatMessage, ChatResponse
+from app.services.llm import get_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -125,8 +125,7 @@ async def chat(messages: list[ChatMessage]) -> ChatResponse:
         openai_messages.append({"role": m.role, "content": m.content})
 
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
-        resp = await client.chat.completions.create(
+        resp = await get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=300,
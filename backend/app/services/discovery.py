@@ -1,31 +1,19 @@
 import asyncio
 import logging
-import math
 import re
 from datetime import datetime, timezone
 
 from bson import ObjectId
-from openai import AsyncOpenAI
+from pymongo import UpdateOne
 
 from app.config import settings
-from app.db import get_db
+from app.db import get_db, haversine_m
 from app.services import embeddings as embeddings_svc
+from app.services.llm import get_openai_client
 from app.services.serpapi_service import search_maps
 
 logger = logging.getLogger(__name__)
 
-_EARTH_RADIUS_M = 6_371_000
-
-
-def _haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """Great-circle distance in metres between two (lat, lng) points."""
-    rlat1, rlng1, rlat2, rlng2 = (math.radians(v) for v in (lat1, lng1, lat2, lng2))
-    dlat = rlat2 - rlat1
-    dlng = rlng2 - rlng1
-    a = math.sin(dlat / 2) ** 2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlng / 2) ** 2
-    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
-
-
 _CONDENSE_PROMPT = (
     "You are a service-type naming assistant. Given a user's free-text search query, "
     "extract a short, canonical service-type name (2-6 words). "
@@ -49,8 +37,7 @@ async def condense_query(query: str) -> str:
         return query.strip().title()
 
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
-        resp = await client.chat.completions.create(
+        resp = await get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=30,
@@ -78,7 +65,7 @@ async def _ensure_service_type(name: str, slug: str) -> str:
     """Return the slug of an existing or newly created service type."""
     db = get_db()
 
-    existing = await db.service_types.find_one({"slug": slug})
+    existing = await db.service_types.find_one({"slug": slug}, {"_id": 1})
     if existing:
         logger.info("Service type '%s' already exists", slug)
         return slug
@@ -108,7 +95,7 @@ async def _ensure_service_type(name: str, slug: str) -> str:
     return slug
 
 
-def _business_to_provider_doc(business: dict, category: str) -> dict:
+def _business_to_provider_doc(business: dict, category: str, now: datetime) -> dict:
     return {
         "name": business["name"],
         "category": category,
@@ -123,7 +110,7 @@ def _business_to_provider_doc(business: dict, category: str) -> dict:
         "description": business.get("type"),
         "phone": business.get("phone"),
         "website": business.get("website"),
-        "created_at": datetime.now(timezone.utc),
+        "created_at": now,
     }
 
 
@@ -164,7 +151,7 @@ async def discover_external(
     before_count = len(businesses)
     businesses = [
         b for b in businesses
-        if _haversine_m(lat, lng, b["latitude"], b["longitude"]) <= radius_meters
+        if haversine_m(lat, lng, b["latitude"], b["longitude"]) <= radius_meters
     ]
     logger.info(
         "SerpAPI returned %d businesses for query=%r (%d after radius filter)",
@@ -174,24 +161,37 @@ async def discover_external(
         return []
 
     db = get_db()
-    provider_ids: list[ObjectId] = []
-    for biz in businesses:
-        if not biz.get("name"):
-            continue
-        doc = _business_to_provider_doc(biz, slug)
-        result = await db.providers.update_one(
-            {"name": doc["name"], "address": doc["address"]},
-            {"$setOnInsert": doc},
-            upsert=True,
-        )
-        pid = result.upserted_id
-        if pid is None:
-            existing = await db.providers.find_one(
+    now = datetime.now(timezone.utc)
+    docs = [_business_to_provider_doc(biz, slug, now) for biz in businesses if biz.get("name")]
+    if not docs:
+        return []
+
+    # One unordered round-trip for all upserts instead of one per business.
+    result = await db.providers.bulk_write(
+        [
+            UpdateOne(
                 {"name": doc["name"], "address": doc["address"]},
-                {"_id": 1},
+                {"$setOnInsert": doc},
+                upsert=True,
             )
-            if existing:
-                pid = existing["_id"]
+            for doc in docs
+        ],
+        ordered=False,
+    )
+    upserted = result.upserted_ids
+
+    existing: dict[tuple[str, str], ObjectId] = {}
+    matched = [doc for i, doc in enumerate(docs) if i not in upserted]
+    if matched:
+        async for doc in db.providers.find(
+            {"$or": [{"name": d["name"], "address": d["address"]} for d in matched]},
+            {"name": 1, "address": 1},
+        ):
+            existing[(doc["name"], doc["address"])] = doc["_id"]
+
+    provider_ids: list[ObjectId] = []
+    for i, doc in enumerate(docs):
+        pid = upserted.get(i) or existing.get((doc["name"], doc["address"]))
         if pid:
             provider_ids.append(pid)
 
@@ -14,10 +14,10 @@ from urllib.parse import urlparse
 
 import httpx
 from bson import ObjectId
-from openai import AsyncOpenAI
 
 from app.config import settings
 from app.db import get_db
+from app.services.llm import get_openai_client
 
 logger = logging.getLogger(__name__)
 
@@ -150,8 +150,7 @@ async def draft_inquiry_email(
         return subject, body
 
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
-        resp = await client.chat.completions.create(
+        resp = await get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             temperature=0.7,
             max_tokens=300,
@@ -213,7 +212,7 @@ async def send_inquiry(provider_id: str, service_type_slug: str) -> dict:
     if not email_to:
         raise ValueError(f"No email found for provider {provider['name']}")
 
-    stype_doc = await db.service_types.find_one({"slug": service_type_slug})
+    stype_doc = await db.service_types.find_one({"slug": service_type_slug}, {"name": 1})
     service_name = stype_doc["name"] if stype_doc else service_type_slug.replace("_", " ").title()
 
     subject, body = await draft_inquiry_email(
@@ -226,6 +225,7 @@ async def send_inquiry(provider_id: str, service_type_slug: str) -> dict:
 
     await asyncio.to_thread(_send_email, email_to, subject, body, message_id)
 
+    now = datetime.now(timezone.utc)
     doc = {
         "provider_id": ObjectId(provider_id),
         "provider_name": provider["name"],
@@ -238,9 +238,9 @@ async def send_inquiry(provider_id: str, service_type_slug: str) -> dict:
         "reply_body": None,
         "extracted_price": None,
         "extracted_currency": None,
-        "sent_at": datetime.now(timezone.utc),
+        "sent_at": now,
         "replied_at": None,
-        "created_at": datetime.now(timezone.utc),
+        "created_at": now,
     }
     result = await db.inquiries.insert_one(doc)
     doc["_id"] = str(result.inserted_id)
@@ -264,8 +264,7 @@ async def _extract_price_from_reply(reply_body: str, service_name: str) -> tuple
         return None, None
 
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
-        resp = await client.chat.completions.create(
+        resp = await get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=100,
@@ -406,7 +405,9 @@ async def check_for_replies() -> int:
         if not inquiry:
             continue
 
-        stype_doc = await db.service_types.find_one({"slug": inquiry["service_type"]})
+        stype_doc = await db.service_types.find_one(
+            {"slug": inquiry["service_type"]}, {"name": 1}
+        )
         service_name = stype_doc["name"] if stype_doc else inquiry["service_type"]
 
         price, currency = await _extract_price_from_reply(reply["body"], service_name)
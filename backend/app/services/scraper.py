@@ -1,23 +1,33 @@
 import asyncio
+import functools
+import heapq
 import json
 import logging
 import re
 import time
 from datetime import datetime, timezone
-from urllib.parse import urljoin, urlparse
+from typing import NamedTuple
+from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
-from openai import AsyncOpenAI
+import lxml.html
+from lxml import etree
+from pymongo.errors import BulkWriteError
 
 from app.config import settings
 from app.db import get_db
+from app.services.llm import get_openai_client
 
 try:
     from linkup import LinkupClient
 except ImportError:
     LinkupClient = None
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
 HEADERS = {
@@ -29,7 +39,9 @@ SKIP_SUBSTRINGS = [
     "blog", "news", "about", "contact", "privacy", "terms",
     "login", "cart", "facebook", "instagram", ".pdf",
 ]
+_SKIP_RE = re.compile("|".join(map(re.escape, SKIP_SUBSTRINGS)))
 PRICE_RE = re.compile(r"([£€$])\s*([0-9]{1,6})(?:[.,]([0-9]{1,2}))?")
+_CURRENCY_SCAN = re.compile(r"[£€$]").search
 TOP_LINKS = 3
 TOP_SUBLINKS = 2
 PRICE_PAGE_KEYWORDS = {
@@ -62,23 +74,55 @@ def _currency_from_symbol(sym: str) -> str:
     return {"€": "EUR", "£": "GBP", "$": "USD"}.get(sym, "")
 
 
-def _tokenize_query(q: str) -> list[str]:
-    return [t for t in re.findall(r"[a-z0-9]+", q.lower()) if len(t) > 1]
+@functools.lru_cache(maxsize=256)
+def _tokenize_query(q: str) -> tuple[str, ...]:
+    return tuple(t for t in re.findall(r"[a-z0-9]+", q.lower()) if len(t) > 1)
+
+
+@functools.lru_cache(maxsize=256)
+def _build_top_phrases(tokens: tuple[str, ...], k: int = 3) -> tuple[str, ...]:
+    """The k longest distinct 3- and 2-word phrases; only these are ever matched."""
+    phrases = [f"{tokens[i]} {tokens[i+1]} {tokens[i+2]}" for i in range(len(tokens) - 2)]
+    phrases += [f"{tokens[i]} {tokens[i+1]}" for i in range(len(tokens) - 1)]
+    return tuple(heapq.nlargest(k, dict.fromkeys(phrases), key=len))
+
+
+@functools.lru_cache(maxsize=512)
+def _phrase_pattern(phrase: str) -> re.Pattern:
+    """Word-bounded pattern for phrase, tolerating spaces or hyphens between words."""
+    return re.compile(r"\b" + r"[\s\-]+".join(map(re.escape, phrase.split())) + r"\b")
 
 
-def _build_phrases(tokens: list[str]) -> list[str]:
-    phrases: list[str] = []
-    for i in range(len(tokens) - 2):
-        phrases.append(f"{tokens[i]} {tokens[i+1]} {tokens[i+2]}")
-    for i in range(len(tokens) - 1):
-        phrases.append(f"{tokens[i]} {tokens[i+1]}")
-    return sorted(set(phrases), key=lambda x: -len(x))
+class QueryTerms(NamedTuple):
+    """Everything the crawler derives from a query, computed once per scrape batch."""
 
+    tokens: tuple[str, ...]
+    top_patterns: tuple[re.Pattern, ...]
+    tset: frozenset[str]
+    # Aho–Corasick automaton over the tokens, when pyahocorasick is installed.
+    automaton: object | None = None
 
-def _phrase_present(text_lower: str, phrase: str) -> bool:
-    parts = phrase.split()
-    pat = r"\b" + r"[\s\-]+".join(map(re.escape, parts)) + r"\b"
-    return re.search(pat, text_lower) is not None
+
+def _build_automaton(tokens: tuple[str, ...]):
+    if ahocorasick is None or not tokens:
+        return None
+    automaton = ahocorasick.Automaton()
+    for t in tokens:
+        automaton.add_word(t, t)
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=256)
+def query_terms(query: str) -> QueryTerms:
+    tokens = _tokenize_query(query)
+    top_phrases = _build_top_phrases(tokens, 3)
+    return QueryTerms(
+        tokens=tokens,
+        top_patterns=tuple(_phrase_pattern(p) for p in top_phrases),
+        tset=frozenset(tokens),
+        automaton=_build_automaton(tokens),
+    )
 
 
 def _parse_price(m: re.Match) -> tuple[str, float]:
@@ -88,8 +132,9 @@ def _parse_price(m: re.Match) -> tuple[str, float]:
     return sym, float(f"{whole}.{frac}")
 
 
-def _same_site(u: str, host: str) -> bool:
-    netloc = urlparse(u).netloc.lower()
+@functools.lru_cache(maxsize=1024)
+def _same_site(netloc: str, host: str) -> bool:
+    netloc = netloc.lower()
     h = host.lower()
     if not netloc:
         return False
@@ -100,114 +145,210 @@ def _same_site(u: str, host: str) -> bool:
     return netloc == h or netloc == suffix or netloc.endswith("." + suffix)
 
 
-def _should_skip(u: str) -> bool:
-    path = (urlparse(u).path or "").lower()
-    return any(x in path for x in SKIP_SUBSTRINGS)
+def _should_skip(path: str) -> bool:
+    return _SKIP_RE.search(path) is not None
 
 
-def _score_url(u: str, tokens: list[str]) -> int:
-    path = (urlparse(u).path or "").lower()
+def _score_path(path: str, tset: frozenset[str]) -> int:
     words = [w for w in re.split(r"[^a-z0-9]+", path) if w]
-    tset = set(tokens)
     overlap = sum(1 for w in words if w in tset)
     extra = sum(1 for w in words if w not in tset)
     price_bonus = 15 if PRICE_PAGE_KEYWORDS & set(words) else 0
     return overlap * 10 - extra + price_bonus
 
 
-def _extract_links(page_url: str, html: str, host: str, tokens: list[str]) -> list[str]:
-    soup = BeautifulSoup(html, "lxml")
-    out: list[str] = []
+def _parse_once(html: str) -> lxml.html.HtmlElement:
+    """Parse a page once; the tree is shared by price scanning and link extraction."""
+    try:
+        return lxml.html.fromstring(html)
+    except ValueError:
+        # lxml rejects str input that carries an XML encoding declaration.
+        return lxml.html.fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        return lxml.html.fromstring("<html></html>")
+
+
+def _extract_links(
+    page_url: str, tree: lxml.html.HtmlElement, host: str, tset: frozenset[str]
+) -> list[str]:
+    scored: list[tuple[str, int]] = []
     seen: set[str] = set()
-    for a in soup.find_all("a", href=True):
-        full = urljoin(page_url, a["href"].strip())
-        if not _same_site(full, host):
+    # Resolves against <base href> too; the price scan only reads text, so
+    # rewriting attributes on the shared tree is harmless.
+    tree.make_links_absolute(page_url, resolve_base_href=True, handle_failures="ignore")
+    for el, attrib, link, _ in tree.iterlinks():
+        if el.tag != "a" or attrib != "href":
             continue
-        if full in seen or _should_skip(full):
+        full = link.strip()
+        if full in seen:
+            continue
+        # Parse each URL once; the same-site, skip and score checks share it.
+        parsed = urlparse(full)
+        if not _same_site(parsed.netloc, host):
+            continue
+        path = parsed.path.lower()
+        if _should_skip(path):
             continue
         seen.add(full)
-        out.append(full)
-    out.sort(key=lambda u: _score_url(u, tokens), reverse=True)
-    return out
+        scored.append((full, _score_path(path, tset)))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return [u for u, _ in scored]
 
 
 MAX_CONTAINER_CHARS = 600
+CONTAINER_TAGS = frozenset({"div", "li", "article", "section", "main", "body"})
+
+# Text nodes outside noise tags — replaces decompose()-ing them from the tree.
+_NOT_NOISE = " and ".join(f"not(ancestor::{t})" for t in NOISE_TAGS)
+_HAS_CURRENCY = " or ".join(f"contains(., '{c}')" for c in "£€$")
+_VISIBLE_TEXT_XPATH = etree.XPath(f".//text()[{_NOT_NOISE}]")
+_PRICE_TEXT_XPATH = etree.XPath(f"//text()[({_HAS_CURRENCY}) and {_NOT_NOISE}]")
+
 
+def _visible_text(el: lxml.html.HtmlElement) -> str:
+    parts = (t.strip() for t in _VISIBLE_TEXT_XPATH(el))
+    return " ".join(p for p in parts if p)
 
-def _find_price_in_html(html: str, tokens: list[str]) -> tuple[str, float] | None:
-    soup = BeautifulSoup(html, "lxml")
-    for t in soup(NOISE_TAGS):
-        t.decompose()
-    phrases = _build_phrases(tokens)
-    top_phrases = phrases[:3]
+
+def _find_price_in_html(
+    tree: lxml.html.HtmlElement, terms: QueryTerms
+) -> tuple[str, float] | None:
+    tokens, top_patterns, tset = terms.tokens, terms.top_patterns, terms.tset
+    automaton = terms.automaton
 
     def container_matches(text_lower: str) -> bool:
-        if tokens and not all(t in text_lower for t in tokens):
+        if automaton is not None:
+            # One pass over the text finds every token at once.
+            found = {word for _, word in automaton.iter(text_lower)}
+            if not found >= tset:
+                return False
+        elif tokens and not all(t in text_lower for t in tokens):
             return False
-        if top_phrases and not any(_phrase_present(text_lower, p) for p in top_phrases):
+        # Phrases need word boundaries and tolerate hyphens or line breaks
+        # between words, so they always go through the precompiled patterns.
+        if top_patterns and not any(pat.search(text_lower) for pat in top_patterns):
             return False
         return True
 
     best: tuple[str, float, int] | None = None  # (sym, val, ctx_len)
+    # Nearby prices share ancestors; render and test each container only once.
+    checked: dict[lxml.html.HtmlElement, tuple[int, bool]] = {}
 
-    for node in soup.find_all(string=lambda s: s and any(c in s for c in "£€$")):
-        raw = str(node)
-        m = PRICE_RE.search(raw)
+    # Currency and noise filtering both happen inside libxml2 in a single pass.
+    for node in _PRICE_TEXT_XPATH(tree):
+        m = PRICE_RE.search(node)
         if not m:
             continue
         sym, val = _parse_price(m)
         if val == 0.0:
             continue
-        cur = node.parent
+        cur = node.getparent()
+        if node.is_tail and cur is not None:
+            cur = cur.getparent()
         for _ in range(12):
             if cur is None:
                 break
-            if cur.name in ("div", "li", "article", "section", "main", "body"):
-                ctx = cur.get_text(" ", strip=True).lower()
-                ctx_len = len(ctx)
+            if cur.tag in CONTAINER_TAGS:
+                seen = checked.get(cur)
+                if seen is None:
+                    ctx = _visible_text(cur).lower()
+                    ctx_len = len(ctx)
+                    matches = ctx_len <= MAX_CONTAINER_CHARS and container_matches(ctx)
+                    seen = checked[cur] = (ctx_len, matches)
+                ctx_len, matches = seen
                 if ctx_len > MAX_CONTAINER_CHARS:
-                    continue
-                if container_matches(ctx):
+                    # Ancestors only get longer.
+                    break
+                if matches:
                     if best is None or ctx_len < best[2]:
                         best = (sym, round(val, 2), ctx_len)
                     break
-            cur = cur.parent
+            cur = cur.getparent()
 
     return (best[0], best[1]) if best else None
 
 
-def _fast_hit(html: str, tokens: list[str]) -> tuple[str, float] | None:
-    if not any(c in html for c in "£€$"):
+def _fast_hit(
+    html: str,
+    low: str,
+    terms: QueryTerms,
+    tree: lxml.html.HtmlElement | None = None,
+) -> tuple[str, float] | None:
+    """Cheap whole-page checks on html and its lowercased copy, then the tree scan."""
+    if not _CURRENCY_SCAN(html):
         return None
-    low = html.lower()
-    if tokens and not all(t in low for t in tokens):
+    if terms.tokens and not all(t in low for t in terms.tokens):
         return None
-    return _find_price_in_html(html, tokens)
+    return _find_price_in_html(tree if tree is not None else _parse_once(html), terms)
 
 
 def _html_to_text(html: str, max_chars: int = MAX_LLM_TEXT) -> str:
-    """Strip noise tags and return plain text, truncated for LLM context."""
-    soup = BeautifulSoup(html, "lxml")
-    for t in soup(NOISE_TAGS):
-        t.decompose()
-    text = soup.get_text(" ", strip=True)
-    return text[:max_chars]
+    """Plain text outside noise tags, truncated for LLM context."""
+    return _visible_text(_parse_once(html))[:max_chars]
 
 
-def _token_overlap(html: str, tokens: list[str]) -> int:
-    low = html.lower()
+def _token_overlap(low: str, tokens: tuple[str, ...]) -> int:
     return sum(1 for t in tokens if t in low)
 
 
-def _scrape_sync(website: str, query: str) -> dict:
-    """Synchronous multi-level crawl of a single website.
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+PER_HOST_CONCURRENCY = 4
+# Prices sit near the main content, so the tail of a huge page is rarely needed.
+MAX_PAGE_BYTES = 512 * 1024
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Process-wide client so keep-alive and HTTP/2 connections outlive one scrape."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(connect=4.0, read=8.0, write=4.0, pool=4.0),
+            limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=50, keepalive_expiry=30,
+            ),
+            headers=HEADERS,
+            follow_redirects=True,
+            verify=True,
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client():
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+async def _get_text(client: httpx.AsyncClient, url: str) -> str:
+    """GET url, reading at most MAX_PAGE_BYTES of the body."""
+    async with client.stream("GET", url) as r:
+        chunks: list[bytes] = []
+        total = 0
+        async for chunk in r.aiter_bytes(65_536):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= MAX_PAGE_BYTES:
+                break
+        body = b"".join(chunks)
+        try:
+            return body.decode(r.charset_encoding or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+
+async def _scrape_provider(
+    client: httpx.AsyncClient, website: str, terms: QueryTerms
+) -> dict:
+    """Multi-level crawl of a single website.
 
     Returns a dict with:
       hit:       price info dict if regex matched, else None
       html_text: cleaned text from the most relevant page (for LLM fallback)
       page_url:  URL that html_text came from
     """
-    tokens = _tokenize_query(query)
+    tokens = terms.tokens
     start = website.rstrip("/")
     host = urlparse(start).netloc
 
@@ -215,49 +356,74 @@ def _scrape_sync(website: str, query: str) -> dict:
     best_url: str | None = None
     best_overlap = -1
 
-    def _track(url: str, raw_html: str):
+    def _track(url: str, raw_html: str, low: str):
         nonlocal best_html, best_url, best_overlap
-        overlap = _token_overlap(raw_html, tokens)
+        overlap = _token_overlap(low, tokens)
         if overlap > best_overlap:
             best_overlap = overlap
             best_html = raw_html
             best_url = url
 
-    timeout = httpx.Timeout(connect=4.0, read=8.0, write=4.0, pool=4.0)
-    limits = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=10)
+    # One crawl covers one site, so this bounds the fan-out per host.
+    sem = asyncio.Semaphore(PER_HOST_CONCURRENCY)
+
+    async def fetch(url: str) -> tuple[str, str | None]:
+        try:
+            async with sem:
+                return url, await _get_text(client, url)
+        except httpx.HTTPError:
+            return url, None
+
+    def spawn(urls: list[str]) -> list[asyncio.Task]:
+        return [asyncio.create_task(fetch(u)) for u in dict.fromkeys(urls)]
+
+    def cancel(tasks: list[asyncio.Task]):
+        for t in tasks:
+            t.cancel()
 
     try:
-        with httpx.Client(
-            timeout=timeout, limits=limits, headers=HEADERS,
-            follow_redirects=True, verify=True,
-        ) as c:
-            home_html = c.get(start).text
-            hit = _fast_hit(home_html, tokens)
-            if hit:
-                return {"hit": {"page_url": start, "symbol": hit[0], "price": hit[1]}}
-            _track(start, home_html)
-
-            lvl1 = _extract_links(start, home_html, host, tokens)[:TOP_LINKS]
-            for u1 in lvl1:
-                try:
-                    html1 = c.get(u1).text
-                except httpx.HTTPError:
+        _, home_html = await fetch(start)
+        if home_html is None:
+            raise httpx.HTTPError(f"failed to fetch {start}")
+        home_low = home_html.lower()
+        home_tree = _parse_once(home_html)
+        hit = _fast_hit(home_html, home_low, terms, home_tree)
+        if hit:
+            return {"hit": {"page_url": start, "symbol": hit[0], "price": hit[1]}}
+        _track(start, home_html, home_low)
+
+        # Each level is fetched concurrently and handled in completion order;
+        # the first page with a price wins and the rest are cancelled.
+        lvl2: list[str] = []
+        tasks = spawn(_extract_links(start, home_tree, host, terms.tset)[:TOP_LINKS])
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                u1, html1 = await next_page
+                if html1 is None:
                     continue
-                hit = _fast_hit(html1, tokens)
+                low1 = html1.lower()
+                tree1 = _parse_once(html1)
+                hit = _fast_hit(html1, low1, terms, tree1)
                 if hit:
                     return {"hit": {"page_url": u1, "symbol": hit[0], "price": hit[1]}}
-                _track(u1, html1)
-
-                lvl2 = _extract_links(u1, html1, host, tokens)[:TOP_SUBLINKS]
-                for u2 in lvl2:
-                    try:
-                        html2 = c.get(u2).text
-                    except httpx.HTTPError:
-                        continue
-                    hit = _fast_hit(html2, tokens)
-                    if hit:
-                        return {"hit": {"page_url": u2, "symbol": hit[0], "price": hit[1]}}
-                    _track(u2, html2)
+                _track(u1, html1, low1)
+                lvl2 += _extract_links(u1, tree1, host, terms.tset)[:TOP_SUBLINKS]
+        finally:
+            cancel(tasks)
+
+        tasks = spawn(lvl2)
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                u2, html2 = await next_page
+                if html2 is None:
+                    continue
+                low2 = html2.lower()
+                hit = _fast_hit(html2, low2, terms)
+                if hit:
+                    return {"hit": {"page_url": u2, "symbol": hit[0], "price": hit[1]}}
+                _track(u2, html2, low2)
+        finally:
+            cancel(tasks)
     except Exception:
         logger.debug("Scrape failed for %s", website, exc_info=True)
 
@@ -288,8 +454,7 @@ async def _llm_extract_price(
             )
         user_msg += f"\nWebpage text:\n{html_text}"
 
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
-        resp = await client.chat.completions.create(
+        resp = await get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=100,
@@ -427,9 +592,13 @@ async def scrape_provider_price(
     website: str,
     query: str,
     provider_name: str = "",
+    terms: QueryTerms | None = None,
 ) -> dict | None:
     """Cascade: regex scraping → LLM extraction → Linkup web search.
 
+    Pass `terms` when scraping many providers for one query so the
+    tokens and phrase patterns are derived only once.
+
     When settings.linkup_only is True, skips scraping/LLM and goes
     straight to Linkup.  Otherwise LLM and Linkup are only tried when
     the provider's website has at least MIN_OVERLAP_FOR_* query-token
@@ -444,7 +613,9 @@ async def scrape_provider_price(
             return linkup_hit
         return None
 
-    result = await asyncio.to_thread(_scrape_sync, website, query)
+    result = await _scrape_provider(
+        _get_http_client(), website, terms or query_terms(query)
+    )
     overlap = result.get("best_overlap", 0)
 
     if result.get("hit"):
@@ -504,49 +675,60 @@ async def scrape_and_store_prices(
         len(scrapable), len(providers), query,
     )
 
+    terms = query_terms(query)
     tasks = [
-        scrape_provider_price(p["website"], query, provider_name=p.get("name", ""))
+        scrape_provider_price(
+            p["website"], query, provider_name=p.get("name", ""), terms=terms,
+        )
         for p in scrapable
     ]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     db = get_db()
-    observations: dict[str, dict] = {}
+    now = datetime.now(timezone.utc)
+    pending: list[tuple[dict, dict, dict]] = []  # (provider, result, obs_doc)
 
     for provider, result in zip(scrapable, results):
         if isinstance(result, Exception) or result is None:
             continue
 
-        pid = provider["_id"]
-        currency = _currency_from_symbol(result["symbol"])
-        source_type = result.get("source_type", "scrape")
-        now = datetime.now(timezone.utc)
-
         obs_doc = {
-            "provider_id": pid,
+            "provider_id": provider["_id"],
             "service_type": service_type_slug,
             "category": service_type_slug,
             "price": result["price"],
-            "currency": currency,
-            "source_type": source_type,
+            "currency": _currency_from_symbol(result["symbol"]),
+            "source_type": result.get("source_type", "scrape"),
             "source_url": result["page_url"],
             "location": provider["location"],
             "observed_at": now,
             "created_at": now,
         }
+        pending.append((provider, result, obs_doc))
+
+    failed: set[int] = set()
+    if pending:
         try:
-            await db.observations.insert_one(obs_doc)
-            observations[str(pid)] = obs_doc
-            logger.info(
-                "[%s] Stored price %s%.2f for %s from %s",
-                source_type, result["symbol"], result["price"],
-                provider["name"], result["page_url"],
+            await db.observations.insert_many(
+                [obs_doc for _, _, obs_doc in pending], ordered=False,
             )
+        except BulkWriteError as e:
+            failed = {err["index"] for err in e.details.get("writeErrors", [])}
+            logger.warning("Failed to store %d observations", len(failed), exc_info=True)
         except Exception:
-            logger.warning(
-                "Failed to store observation for %s", provider["name"],
-                exc_info=True,
-            )
+            failed = set(range(len(pending)))
+            logger.warning("Failed to store observations", exc_info=True)
+
+    observations: dict[str, dict] = {}
+    for i, (provider, result, obs_doc) in enumerate(pending):
+        if i in failed:
+            continue
+        observations[str(provider["_id"])] = obs_doc
+        logger.info(
+            "[%s] Stored price %s%.2f for %s from %s",
+            obs_doc["source_type"], result["symbol"], result["price"],
+            provider["name"], result["page_url"],
+        )
 
     logger.info(
         "Scraping complete: %d/%d providers returned prices",
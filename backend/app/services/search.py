@@ -1,15 +1,16 @@
 import asyncio
+import heapq
 import json
 import logging
 import math
 import statistics
 
 from bson import ObjectId
-from langchain_mongodb import MongoDBAtlasVectorSearch
-from openai import AsyncOpenAI
+from cachetools import LRUCache, TTLCache
 
 from app.config import settings
-from app.db import get_db, get_sync_db
+from app.db import get_db
+from app.models.provider import GeoJSONPoint
 from app.models.search import (
     MatchedServiceType,
     ObservationSummary,
@@ -20,7 +21,9 @@ from app.models.search import (
 from app.services.discovery import discover_external, name_to_slug
 from app.services import embeddings as embeddings_svc
 from app.services.email_service import check_for_replies
+from app.services.llm import get_openai_client
 from app.services.scraper import scrape_and_store_prices
+from app.services import vector_index
 
 logger = logging.getLogger(__name__)
 
@@ -28,33 +31,44 @@ VECTOR_INDEX_NAME = "service_types_vector"
 TEXT_INDEX_NAME = "service_types_text"
 VECTOR_SCORE_THRESHOLD = 0.75
 TEXT_SCORE_THRESHOLD = 0.10
+# Every search aggregation returns at most 50 documents, so one batch covers it.
+_BATCH_SIZE = 64
 
 _scraping_provider_ids: set[str] = set()
 _scrape_done_ids: set[str] = set()
 
 
-def _get_vector_store() -> MongoDBAtlasVectorSearch | None:
-    """Returns None when embeddings are not configured."""
+_query_vectors: LRUCache = LRUCache(maxsize=1024)
+
+
+async def _embed_query(query: str) -> list[float] | None:
+    """Query embedding for $vectorSearch, or None when embeddings are unavailable.
+
+    Repeat queries reuse the cached vector instead of calling the embeddings API.
+    """
     if not embeddings_svc.is_available():
+        logger.debug("Vector search skipped — OPENAI_API_KEY not set")
+        return None
+    cached = _query_vectors.get(query)
+    if cached is not None:
+        return cached
+    try:
+        vector = await asyncio.wait_for(
+            embeddings_svc.get_embeddings().aembed_query(query), timeout=5.0
+        )
+        _query_vectors[query] = vector
+        return vector
+    except (asyncio.TimeoutError, Exception):
+        logger.warning("Query embedding failed or timed out — falling back to text-only", exc_info=True)
         return None
-    sync_db = get_sync_db()
-    return MongoDBAtlasVectorSearch(
-        embedding=embeddings_svc.get_embeddings(),
-        collection=sync_db.service_types,
-        index_name=VECTOR_INDEX_NAME,
-        text_key="name",
-        embedding_key="embedding",
-        relevance_score_fn="cosine",
-    )
 
 
-async def match_service_types_text(query: str) -> list[MatchedServiceType]:
-    """Atlas full-text search on service_types (name, slug, category).
+_MATCH_FIELDS = {"slug": 1, "name": 1, "score": 1, "match_source": 1}
+_MAX_MATCHES = 10
 
-    Returns an empty list if the Atlas Search index is unavailable.
-    """
-    db = get_db()
-    pipeline = [
+
+def _text_stages(query: str) -> list[dict]:
+    return [
         {
             "$search": {
                 "index": TEXT_INDEX_NAME,
@@ -63,74 +77,156 @@ async def match_service_types_text(query: str) -> list[MatchedServiceType]:
                     "path": ["name", "slug", "category"],
                     "fuzzy": {"maxEdits": 1},
                 },
+                # slug and name are in the index's storedSource, so mongot
+                # answers without a full-document fetch per hit.
+                "returnStoredSource": True,
             }
         },
-        {"$addFields": {"score": {"$meta": "searchScore"}}},
+        {"$addFields": {"score": {"$meta": "searchScore"}, "match_source": "text"}},
         {"$match": {"score": {"$gte": TEXT_SCORE_THRESHOLD}}},
-        {"$limit": 10},
-        {"$project": {"slug": 1, "name": 1, "score": 1}},
+        {"$limit": _MAX_MATCHES},
+        {"$project": _MATCH_FIELDS},
     ]
-    results: list[MatchedServiceType] = []
+
+
+def _vector_stages(query_vector: list[float]) -> list[dict]:
+    return [
+        {
+            "$vectorSearch": {
+                "index": VECTOR_INDEX_NAME,
+                "path": "embedding",
+                "queryVector": query_vector,
+                "numCandidates": 100,
+                "limit": _MAX_MATCHES,
+            }
+        },
+        {"$addFields": {"score": {"$meta": "vectorSearchScore"}, "match_source": "vector"}},
+        {"$match": {"score": {"$gte": VECTOR_SCORE_THRESHOLD}}},
+        {"$project": _MATCH_FIELDS},
+    ]
+
+
+# Best match per slug, highest scores first.
+_DEDUPE_STAGES = [
+    {"$sort": {"score": -1}},
+    {
+        "$group": {
+            "_id": "$slug",
+            "name": {"$first": "$name"},
+            "score": {"$first": "$score"},
+            "match_source": {"$first": "$match_source"},
+        }
+    },
+    {"$sort": {"score": -1}},
+    {"$limit": _MAX_MATCHES},
+]
+
+
+async def _aggregate_matches(pipeline: list[dict]) -> list[MatchedServiceType]:
+    db = get_db()
+    docs = await db.service_types.aggregate(
+        pipeline, maxTimeMS=4000, batchSize=_BATCH_SIZE
+    ).to_list(length=_BATCH_SIZE)
+    return [
+        MatchedServiceType(
+            slug=doc["_id"],
+            name=doc["name"],
+            match_source=doc["match_source"],
+            score=doc["score"],
+        )
+        for doc in docs
+    ]
+
+
+async def _text_matches(query: str) -> list[MatchedServiceType]:
     try:
-        async for doc in db.service_types.aggregate(pipeline, maxTimeMS=4000):
-            results.append(
-                MatchedServiceType(
-                    slug=doc["slug"],
-                    name=doc["name"],
-                    match_source="text",
-                    score=doc["score"],
-                )
-            )
+        return await _aggregate_matches(_text_stages(query) + _DEDUPE_STAGES)
     except Exception:
         logger.warning("Text search failed — Atlas Search index may not exist", exc_info=True)
-    return results
-
+        return []
 
-async def match_service_types_vector(query: str) -> list[MatchedServiceType]:
-    """Atlas Vector Search — semantic matching on service type embeddings.
 
-    Returns an empty list when embeddings are not configured or the search fails.
-    """
-    vector_store = _get_vector_store()
-    if vector_store is None:
-        logger.debug("Vector search skipped — OPENAI_API_KEY not set")
+async def _vector_matches(query_vector: list[float] | None) -> list[MatchedServiceType]:
+    if query_vector is None:
         return []
-
+    if vector_index.is_available():
+        return [
+            MatchedServiceType(slug=slug, name=name, match_source="vector", score=score)
+            for slug, name, score in vector_index.search(query_vector, k=_MAX_MATCHES)
+            if score >= VECTOR_SCORE_THRESHOLD
+        ]
     try:
-        docs_and_scores = await asyncio.wait_for(
-            asyncio.to_thread(vector_store.similarity_search_with_score, query, k=10),
-            timeout=5.0,
-        )
-    except (asyncio.TimeoutError, Exception):
-        logger.warning("Vector search failed or timed out — falling back to text-only", exc_info=True)
+        return await _aggregate_matches(_vector_stages(query_vector) + _DEDUPE_STAGES)
+    except Exception:
+        logger.warning("Vector search failed — Atlas Vector Search index may not exist", exc_info=True)
         return []
 
-    results: list[MatchedServiceType] = []
-    for doc, score in docs_and_scores:
-        if score < VECTOR_SCORE_THRESHOLD:
-            continue
-        results.append(
-            MatchedServiceType(
-                slug=doc.metadata.get("slug", ""),
-                name=doc.page_content,
-                match_source="vector",
-                score=score,
+
+def _merge_matches(*groups: list[MatchedServiceType]) -> list[MatchedServiceType]:
+    best: dict[str, MatchedServiceType] = {}
+    for group in groups:
+        for m in group:
+            if m.slug not in best or m.score > best[m.slug].score:
+                best[m.slug] = m
+    return heapq.nlargest(_MAX_MATCHES, best.values(), key=lambda m: m.score)
+
+
+async def match_service_types(query: str) -> list[MatchedServiceType]:
+    """Atlas full-text and vector search on service_types.
+
+    With the query vector already cached, both run in one aggregation
+    ($search + $unionWith/$vectorSearch, deduplicated by slug on the server).
+    Otherwise the text leg runs while the query is embedded, and the vector
+    leg follows; semantic matches come from the in-process index when it is
+    loaded (see vector_index). If either leg fails, the other's matches are
+    still returned.
+    """
+    query_vector = _query_vectors.get(query)
+    if query_vector is not None and not vector_index.is_available():
+        try:
+            return await _aggregate_matches(
+                _text_stages(query)
+                + [{"$unionWith": {"coll": "service_types", "pipeline": _vector_stages(query_vector)}}]
+                + _DEDUPE_STAGES
             )
+        except Exception:
+            logger.warning("Fused service-type search failed — retrying legs separately", exc_info=True)
+        text, vector = await asyncio.gather(
+            _text_matches(query), _vector_matches(query_vector)
         )
-    return results
+        return _merge_matches(text, vector)
+
+    text, query_vector = await asyncio.gather(_text_matches(query), _embed_query(query))
+    return _merge_matches(text, await _vector_matches(query_vector))
+
+
+# Provider fields read when building ProviderWithPrices.
+_PROVIDER_FIELDS = {
+    "name": 1, "category": 1, "address": 1, "city": 1, "location": 1,
+    "rating": 1, "review_count": 1, "description": 1, "website": 1,
+}
+
+
+def _category_label_stages(category_field: str) -> list[dict]:
+    """$lookup the service-type name for category_field into `category_label`."""
+    return [
+        {
+            "$lookup": {
+                "from": "service_types",
+                "localField": category_field,
+                "foreignField": "slug",
+                "pipeline": [{"$project": {"name": 1, "_id": 0}}],
+                "as": "_st",
+            }
+        },
+        {"$addFields": {"category_label": {"$ifNull": [{"$first": "$_st.name"}, ""]}}},
+        {"$project": {"_st": 0}},
+    ]
 
 
-def _merge_service_types(
-    text_matches: list[MatchedServiceType],
-    vector_matches: list[MatchedServiceType],
-) -> list[MatchedServiceType]:
-    """Deduplicate by slug, preferring the higher-scoring match."""
-    by_slug: dict[str, MatchedServiceType] = {}
-    for m in text_matches + vector_matches:
-        existing = by_slug.get(m.slug)
-        if existing is None or m.score > existing.score:
-            by_slug[m.slug] = m
-    return sorted(by_slug.values(), key=lambda m: m.score, reverse=True)
+def _category_label(label: str, category: str) -> str:
+    """Fallback for categories without a service_types entry."""
+    return label or category.replace("_", " ").title()
 
 
 async def find_providers_with_prices(
@@ -139,7 +235,7 @@ async def find_providers_with_prices(
     lng: float,
     radius_meters: float,
 ) -> list[ProviderWithPrices]:
-    """Geo query on observations, grouped by provider with a $lookup."""
+    """Geo query on observations, grouped by provider, then a $lookup per provider."""
     db = get_db()
     pipeline = [
         {
@@ -149,21 +245,18 @@ async def find_providers_with_prices(
                 "maxDistance": radius_meters,
                 "query": {"service_type": {"$in": service_type_slugs}},
                 "spherical": True,
+                "key": "location",
             }
         },
         {
-            "$lookup": {
-                "from": "providers",
-                "localField": "provider_id",
-                "foreignField": "_id",
-                "as": "provider",
+            "$project": {
+                "provider_id": 1, "service_type": 1, "price": 1, "currency": 1,
+                "source_type": 1, "observed_at": 1, "distance_meters": 1,
             }
         },
-        {"$unwind": "$provider"},
         {
             "$group": {
                 "_id": "$provider_id",
-                "provider": {"$first": "$provider"},
                 "observations": {
                     "$push": {
                         "service_type": "$service_type",
@@ -178,25 +271,45 @@ async def find_providers_with_prices(
         },
         {"$sort": {"distance_meters": 1}},
         {"$limit": 50},
+        # Join providers after grouping so there is one lookup per provider
+        # (at most 50), not one per matching observation.
+        {
+            "$lookup": {
+                "from": "providers",
+                "localField": "_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": _PROVIDER_FIELDS}],
+                "as": "provider",
+            }
+        },
+        {"$unwind": "$provider"},
+        # Attach the service-type display name in the same round-trip.
+        *_category_label_stages("provider.category"),
     ]
 
+    # Documents come straight from typed pipeline projections, so the
+    # models are built with model_construct and skip validation.
     results: list[ProviderWithPrices] = []
-    async for doc in db.observations.aggregate(pipeline, maxTimeMS=4000):
+    docs = await db.observations.aggregate(
+        pipeline, maxTimeMS=4000, batchSize=_BATCH_SIZE
+    ).to_list(length=_BATCH_SIZE)
+    for doc in docs:
         p = doc["provider"]
         results.append(
-            ProviderWithPrices(
+            ProviderWithPrices.model_construct(
                 id=str(p["_id"]),
                 name=p["name"],
                 category=p["category"],
                 address=p["address"],
                 city=p.get("city", ""),
-                location=p["location"],
+                location=GeoJSONPoint.model_construct(**p["location"]),
                 distance_meters=doc["distance_meters"],
                 rating=p.get("rating"),
                 review_count=p.get("review_count"),
                 description=p.get("description"),
                 website=p.get("website"),
-                observations=[ObservationSummary(**o) for o in doc["observations"]],
+                category_label=_category_label(doc["category_label"], p["category"]),
+                observations=[ObservationSummary.model_construct(**o) for o in doc["observations"]],
             )
         )
     return results
@@ -222,27 +335,35 @@ async def find_providers_by_category(
                 "maxDistance": radius_meters,
                 "query": {"category": {"$in": service_type_slugs}},
                 "spherical": True,
+                "key": "location",
             }
         },
+        {"$project": {**_PROVIDER_FIELDS, "distance_meters": 1}},
         {"$sort": {"distance_meters": 1}},
         {"$limit": 50},
+        *_category_label_stages("category"),
     ]
 
     results: list[ProviderWithPrices] = []
-    async for doc in db.providers.aggregate(pipeline, maxTimeMS=4000):
+    docs = await db.providers.aggregate(
+        pipeline, maxTimeMS=4000, batchSize=_BATCH_SIZE
+    ).to_list(length=_BATCH_SIZE)
+    for doc in docs:
+        category = doc.get("category") or ""
         results.append(
-            ProviderWithPrices(
+            ProviderWithPrices.model_construct(
                 id=str(doc["_id"]),
                 name=doc["name"],
-                category=doc.get("category") or "",
+                category=category,
                 address=doc.get("address") or "",
                 city=doc.get("city") or "",
-                location=doc["location"],
+                location=GeoJSONPoint.model_construct(**doc["location"]),
                 distance_meters=doc.get("distance_meters", 0),
                 rating=doc.get("rating"),
                 review_count=doc.get("review_count"),
                 description=doc.get("description"),
                 website=doc.get("website"),
+                category_label=_category_label(doc["category_label"], category),
             )
         )
     return results
@@ -254,78 +375,46 @@ async def find_providers_by_ids(
     lng: float,
     radius_meters: float | None = None,
 ) -> list[ProviderWithPrices]:
-    """Fetch specific providers by ID and compute distance from the search point."""
+    """Fetch specific providers by ID, nearest first, via $geoNear restricted to those IDs."""
     if not provider_ids:
         return []
     db = get_db()
     pipeline = [
-        {"$match": {"_id": {"$in": provider_ids}}},
         {
-            "$addFields": {
-                "distance_meters": {
-                    "$let": {
-                        "vars": {
-                            "coords": "$location.coordinates",
-                            "refLng": lng,
-                            "refLat": lat,
-                        },
-                        "in": {
-                            "$multiply": [
-                                6371000,
-                                {
-                                    "$acos": {
-                                        "$min": [
-                                            1.0,
-                                            {
-                                                "$add": [
-                                                    {
-                                                        "$multiply": [
-                                                            {"$sin": {"$degreesToRadians": lat}},
-                                                            {"$sin": {"$degreesToRadians": {"$arrayElemAt": ["$$coords", 1]}}},
-                                                        ]
-                                                    },
-                                                    {
-                                                        "$multiply": [
-                                                            {"$cos": {"$degreesToRadians": lat}},
-                                                            {"$cos": {"$degreesToRadians": {"$arrayElemAt": ["$$coords", 1]}}},
-                                                            {"$cos": {"$degreesToRadians": {"$subtract": [{"$arrayElemAt": ["$$coords", 0]}, lng]}}},
-                                                        ]
-                                                    },
-                                                ]
-                                            },
-                                        ]
-                                    }
-                                },
-                            ]
-                        },
-                    }
-                }
+            "$geoNear": {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "distanceField": "distance_meters",
+                "query": {"_id": {"$in": provider_ids}},
+                "spherical": True,
+                "key": "location",
+                **({"maxDistance": radius_meters} if radius_meters is not None else {}),
             }
         },
-        *(
-            [{"$match": {"distance_meters": {"$lte": radius_meters}}}]
-            if radius_meters is not None
-            else []
-        ),
-        {"$sort": {"distance_meters": 1}},
+        {"$project": {**_PROVIDER_FIELDS, "distance_meters": 1}},
         {"$limit": 50},
+        *_category_label_stages("category"),
     ]
 
     results: list[ProviderWithPrices] = []
-    async for doc in db.providers.aggregate(pipeline, maxTimeMS=4000):
+    docs = await db.providers.aggregate(
+        pipeline, maxTimeMS=4000, batchSize=_BATCH_SIZE
+    ).to_list(length=_BATCH_SIZE)
+    for doc in docs:
+        category = doc.get("category") or ""
         results.append(
-            ProviderWithPrices(
+            ProviderWithPrices.model_construct(
                 id=str(doc["_id"]),
                 name=doc["name"],
-                category=doc.get("category") or "",
+                category=category,
                 address=doc.get("address") or "",
                 city=doc.get("city") or "",
-                location=doc["location"],
+                location=GeoJSONPoint.model_construct(**doc["location"]),
                 distance_meters=doc.get("distance_meters", 0),
                 rating=doc.get("rating"),
                 review_count=doc.get("review_count"),
                 description=doc.get("description"),
                 website=doc.get("website"),
+                category_label=_category_label(doc["category_label"], category),
             )
         )
     return results
@@ -349,6 +438,10 @@ _INTENT_PROMPT = (
 )
 
 
+# (normalised query, sorted candidate slugs) -> (condensed name, relevant slugs)
+_intent_cache: LRUCache = LRUCache(maxsize=4096)
+
+
 async def _resolve_intent(
     query: str,
     candidates: list[MatchedServiceType],
@@ -360,7 +453,17 @@ async def _resolve_intent(
     if not settings.openai_api_key:
         return query.strip().title(), candidates
 
+    # The query already names the only candidate: nothing for the LLM to decide.
+    if len(candidates) == 1 and candidates[0].slug == name_to_slug(query):
+        return candidates[0].name, candidates
+
     slug_map = {m.slug: m for m in candidates}
+    cache_key = (query.strip().lower(), tuple(sorted(slug_map)))
+    cached = _intent_cache.get(cache_key)
+    if cached is not None:
+        condensed_name, valid_slugs = cached
+        return condensed_name, [slug_map[s] for s in valid_slugs]
+
     if candidates:
         listing = "\n".join(f"- {m.slug}: {m.name}" for m in candidates)
         candidates_block = f"\nExisting service types:\n{listing}"
@@ -370,22 +473,22 @@ async def _resolve_intent(
     user_msg = f'User query: "{query}"{candidates_block}'
 
     try:
-        client = AsyncOpenAI(api_key=settings.openai_api_key)
-        resp = await client.chat.completions.create(
+        resp = await get_openai_client().chat.completions.create(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=200,
             timeout=10.0,
+            response_format={"type": "json_object"},
             messages=[
                 {"role": "system", "content": _INTENT_PROMPT},
                 {"role": "user", "content": user_msg},
             ],
         )
-        content = resp.choices[0].message.content.strip()
-        parsed = json.loads(content)
+        parsed = json.loads(resp.choices[0].message.content)
         condensed_name = parsed["name"]
         valid_slugs = set(parsed.get("relevant_slugs", []))
         validated = [slug_map[s] for s in valid_slugs if s in slug_map]
+        _intent_cache[cache_key] = (condensed_name, tuple(m.slug for m in validated))
         logger.info(
             "Resolved intent for %r: name=%r, kept %d/%d slugs %s",
             query, condensed_name, len(validated), len(candidates),
@@ -398,15 +501,15 @@ async def _resolve_intent(
 
 
 async def _fetch_provider_docs(provider_ids: list[str]) -> list[dict]:
-    """Fetch raw provider documents by ID, including the website field."""
+    """Fetch the provider fields the scraper needs (_id, name, website, location)."""
     if not provider_ids:
         return []
     db = get_db()
     oids = [ObjectId(pid) for pid in provider_ids]
-    docs = []
-    async for doc in db.providers.find({"_id": {"$in": oids}}):
-        docs.append(doc)
-    return docs
+    cursor = db.providers.find(
+        {"_id": {"$in": oids}}, {"_id": 1, "name": 1, "website": 1, "location": 1}
+    )
+    return await cursor.to_list(length=len(oids))
 
 
 def _providers_needing_scrape(providers: list[ProviderWithPrices]) -> list[str]:
@@ -436,7 +539,7 @@ async def _enrich_with_scraped_prices(
         obs = observations.get(p.id)
         if obs:
             p.observations.append(
-                ObservationSummary(
+                ObservationSummary.model_construct(
                     service_type=obs["service_type"],
                     price=obs["price"],
                     currency=obs["currency"],
@@ -556,19 +659,52 @@ def _compute_price_stats(providers: list[ProviderWithPrices]) -> PriceStats | No
     )
 
 
-async def _resolve_category_labels(providers: list[ProviderWithPrices]) -> None:
-    """Look up service_types by slug and set category_label on each provider."""
-    slugs = list({p.category for p in providers})
+async def _find_nearby(
+    slugs: list[str],
+    lat: float,
+    lng: float,
+    radius_meters: float,
+) -> list[ProviderWithPrices]:
+    """Priced providers first, then unpriced ones in the same categories."""
     if not slugs:
-        return
+        return []
+    priced, unpriced = await asyncio.gather(
+        find_providers_with_prices(slugs, lat, lng, radius_meters),
+        find_providers_by_category(slugs, lat, lng, radius_meters),
+    )
+    seen_ids = {p.id for p in priced}
+    return priced + [p for p in unpriced if p.id not in seen_ids]
+
+
+# slug -> service type name. Only hits are cached: a miss may be created
+# by discovery moments later.
+_SLUG_NAME_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=300)
 
+
+async def _service_type_name(slug: str) -> str | None:
+    """Name of the service type with this slug, or None if there is none."""
+    name = _SLUG_NAME_CACHE.get(slug)
+    if name is not None:
+        return name
     db = get_db()
-    slug_to_name: dict[str, str] = {}
-    async for doc in db.service_types.find({"slug": {"$in": slugs}}, {"slug": 1, "name": 1}, max_time_ms=4000):
-        slug_to_name[doc["slug"]] = doc["name"]
+    doc = await db.service_types.find_one({"slug": slug}, {"name": 1})
+    if doc is None:
+        return None
+    _SLUG_NAME_CACHE[slug] = doc["name"]
+    return doc["name"]
 
-    for p in providers:
-        p.category_label = slug_to_name.get(p.category, p.category.replace("_", " ").title())
+
+# Settled responses, keyed like _search_key. Short TTL so new observations
+# show up quickly.
+_RESULT_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+# Identical searches already running, keyed like _search_key. Later callers
+# await the first caller's task instead of repeating the pipeline.
+_INFLIGHT: dict[tuple, asyncio.Task] = {}
+
+
+def _search_key(query: str, lat: float, lng: float, radius_meters: float) -> tuple:
+    return (query.strip().lower(), round(lat, 3), round(lng, 3), int(radius_meters))
 
 
 async def search(
@@ -577,46 +713,71 @@ async def search(
     lng: float,
     radius_meters: float,
 ) -> SearchResponse:
-    """Run text + vector search, find nearby providers, trigger discovery if empty."""
+    """Run text + vector search, find nearby providers, trigger discovery if empty.
+
+    Concurrent identical searches (same query, coordinates to ~100 m, radius)
+    share one run, and settled results are reused for 30 s.
+    """
+    key = _search_key(query, lat, lng, radius_meters)
+    cached = _RESULT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(_search(query, lat, lng, radius_meters))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    # A disconnecting caller must not cancel the run others are waiting on.
+    response = await asyncio.shield(task)
+    # Responses still being filled in by scraping or discovery are polled
+    # for updates, so only settled ones are cached.
+    if response.results and not response.scraping_in_progress:
+        _RESULT_CACHE[key] = response
+    return response
+
+
+async def _search(
+    query: str,
+    lat: float,
+    lng: float,
+    radius_meters: float,
+) -> SearchResponse:
 
     asyncio.create_task(_check_replies_background())
 
-    text_matches, vector_matches = await asyncio.gather(
-        match_service_types_text(query),
-        match_service_types_vector(query),
-    )
-    merged = _merge_service_types(text_matches, vector_matches)
+    matches = await match_service_types(query)
 
-    condensed_name, validated = await _resolve_intent(query, merged)
+    condensed_name, validated = await _resolve_intent(query, matches)
     condensed_slug = name_to_slug(condensed_name)
 
-    validated_slugs = {m.slug for m in validated}
-    if condensed_slug not in validated_slugs:
-        db = get_db()
-        existing = await db.service_types.find_one(
-            {"slug": condensed_slug}, {"slug": 1, "name": 1}
-        )
-        if existing:
-            validated.insert(
-                0,
-                MatchedServiceType(
-                    slug=existing["slug"],
-                    name=existing["name"],
-                    match_source="text",
-                    score=1.0,
-                ),
-            )
-
     slugs = [m.slug for m in validated]
+    # Start the geo queries for the validated slugs right away. If the
+    # condensed slug turns out to be an existing type we missed, the
+    # speculative task is cancelled and rerun with it included.
+    nearby = asyncio.create_task(_find_nearby(slugs, lat, lng, radius_meters))
 
-    providers: list[ProviderWithPrices] = []
-    if slugs:
-        priced, unpriced = await asyncio.gather(
-            find_providers_with_prices(slugs, lat, lng, radius_meters),
-            find_providers_by_category(slugs, lat, lng, radius_meters),
-        )
-        seen_ids = {p.id for p in priced}
-        providers = priced + [p for p in unpriced if p.id not in seen_ids]
+    try:
+        if condensed_slug not in slugs:
+            existing_name = await _service_type_name(condensed_slug)
+            if existing_name is not None:
+                validated.insert(
+                    0,
+                    MatchedServiceType(
+                        slug=condensed_slug,
+                        name=existing_name,
+                        match_source="text",
+                        score=1.0,
+                    ),
+                )
+                slugs = [m.slug for m in validated]
+                nearby.cancel()
+                nearby = asyncio.create_task(_find_nearby(slugs, lat, lng, radius_meters))
+
+        providers = await nearby
+    except BaseException:
+        # Never leave the speculative query running unobserved.
+        nearby.cancel()
+        raise
 
     discovery_triggered = False
     if not providers:
@@ -637,10 +798,7 @@ async def search(
     scraping_in_progress = False
     if providers:
         primary_slug = slugs[0] if slugs else condensed_slug
-        await asyncio.gather(
-            _resolve_category_labels(providers),
-            _resolve_inquiry_statuses(providers),
-        )
+        await _resolve_inquiry_statuses(providers)
         needs_scrape = {p.id for p in providers if not p.observations}
         new_to_scrape = needs_scrape - _scraping_provider_ids - _scrape_done_ids
         if new_to_scrape:
@@ -5,11 +5,13 @@ import stripe
 from app.config import settings
 
 stripe.api_key = settings.stripe_secret_key
+# One async client for the process: requests run on the event loop and
+# connections to api.stripe.com are kept alive between calls.
+stripe.default_http_client = stripe.HTTPXClient()
 
 
 async def create_stripe_customer(name: str, email: str) -> stripe.Customer:
-    return await asyncio.to_thread(
-        stripe.Customer.create,
+    return await stripe.Customer.create_async(
         name=name,
         email=email,
         metadata={"source": "plumline"},
@@ -17,8 +19,7 @@ async def create_stripe_customer(name: str, email: str) -> stripe.Customer:
 
 
 async def create_setup_intent(stripe_customer_id: str) -> stripe.SetupIntent:
-    return await asyncio.to_thread(
-        stripe.SetupIntent.create,
+    return await stripe.SetupIntent.create_async(
         customer=stripe_customer_id,
         payment_method_types=["card"],
     )
@@ -28,13 +29,11 @@ async def attach_payment_method(
     stripe_customer_id: str,
     payment_method_id: str,
 ) -> str:
-    pm = await asyncio.to_thread(
-        stripe.PaymentMethod.attach,
+    pm = await stripe.PaymentMethod.attach_async(
         payment_method_id,
         customer=stripe_customer_id,
     )
-    await asyncio.to_thread(
-        stripe.Customer.modify,
+    await stripe.Customer.modify_async(
         stripe_customer_id,
         invoice_settings={"default_payment_method": pm.id},
     )
@@ -60,13 +59,46 @@ async def charge_customer(
     )
     if payment_method_id:
         kwargs["payment_method"] = payment_method_id
-    return await asyncio.to_thread(stripe.PaymentIntent.create, **kwargs)
+    return await stripe.PaymentIntent.create_async(**kwargs)
+
+
+async def attach_and_charge(
+    stripe_customer_id: str,
+    payment_method_id: str,
+    amount_pence: int,
+    currency: str,
+    description: str,
+    metadata: dict,
+) -> stripe.PaymentIntent:
+    """Attach a PaymentMethod and charge it.
+
+    Making it the customer's default and creating the PaymentIntent both
+    only need the attach to have happened, so they run concurrently.
+    """
+    pm = await stripe.PaymentMethod.attach_async(
+        payment_method_id,
+        customer=stripe_customer_id,
+    )
+    _, payment_intent = await asyncio.gather(
+        stripe.Customer.modify_async(
+            stripe_customer_id,
+            invoice_settings={"default_payment_method": pm.id},
+        ),
+        charge_customer(
+            stripe_customer_id=stripe_customer_id,
+            amount_pence=amount_pence,
+            currency=currency,
+            description=description,
+            metadata=metadata,
+            payment_method_id=pm.id,
+        ),
+    )
+    return payment_intent
 
 
 async def topup_platform_balance(amount_pence: int, currency: str) -> stripe.Topup:
     """Fund the platform test balance so Issuing cards can be authorized. Test mode only."""
-    return await asyncio.to_thread(
-        stripe.Topup.create,
+    return await stripe.Topup.create_async(
         amount=amount_pence,
         currency=currency,
         description="Plumline platform top-up for issuing",
@@ -81,8 +113,7 @@ async def create_cardholder(
     first_name: str = "Demo",
     last_name: str = "Agent",
 ) -> stripe.issuing.Cardholder:
-    return await asyncio.to_thread(
-        stripe.issuing.Cardholder.create,
+    return await stripe.issuing.Cardholder.create_async(
         name=agent_name,
         email=email,
         type="individual",
@@ -102,8 +133,7 @@ async def create_virtual_card(
     amount_pence: int,
     currency: str,
 ) -> stripe.issuing.Card:
-    return await asyncio.to_thread(
-        stripe.issuing.Card.create,
+    return await stripe.issuing.Card.create_async(
         cardholder=cardholder_id,
         type="virtual",
         currency=currency,
@@ -121,8 +151,7 @@ async def create_virtual_card(
 
 async def reveal_card_details(card_id: str) -> dict:
     """Retrieve full card details including PAN and CVC. Works server-side in test mode."""
-    card = await asyncio.to_thread(
-        stripe.issuing.Card.retrieve,
+    card = await stripe.issuing.Card.retrieve_async(
         card_id,
         expand=["number", "cvc"],
     )
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+
+from app.db import get_db
+from app.services.embeddings import EMBEDDING_DIMENSIONS
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:
+    faiss = None
+    np = None
+
+logger = logging.getLogger(__name__)
+
+HNSW_M = 32
+# Coalesce bursts of service_types writes into one rebuild.
+REBUILD_DELAY = 2.0
+
+# Swapped as a whole on rebuild so searches never see a half-built index.
+_state: tuple[object, list[str], list[str]] | None = None
+
+
+def is_available() -> bool:
+    """True when faiss is installed and the index has been built."""
+    return _state is not None
+
+
+def _build(vectors: list[list[float]]):
+    matrix = np.asarray(vectors, dtype="float32")
+    faiss.normalize_L2(matrix)
+    # int8 scalar quantisation: a quarter of the float32 memory, int8 SIMD distances.
+    index = faiss.IndexHNSWSQ(
+        EMBEDDING_DIMENSIONS, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT
+    )
+    index.train(matrix)
+    index.add(matrix)
+    return index
+
+
+async def rebuild():
+    """Load every service type embedding and replace the in-memory index."""
+    global _state
+    db = get_db()
+    docs = await db.service_types.find(
+        {"embedding": {"$exists": True}}, {"slug": 1, "name": 1, "embedding": 1}
+    ).to_list(length=None)
+    docs = [d for d in docs if len(d["embedding"]) == EMBEDDING_DIMENSIONS]
+    if not docs:
+        _state = None
+        return
+    index = await asyncio.to_thread(_build, [d["embedding"] for d in docs])
+    _state = (index, [d["slug"] for d in docs], [d["name"] for d in docs])
+    logger.info("Local vector index built with %d service types", len(docs))
+
+
+async def run():
+    """Build the index, then rebuild it whenever service_types changes.
+
+    Change streams need a replica set; on a standalone mongod the index is
+    built once and only refreshed on restart.
+    """
+    if faiss is None:
+        logger.info("faiss not installed — vector search stays on Atlas")
+        return
+    try:
+        await rebuild()
+    except Exception:
+        logger.warning("Local vector index build failed", exc_info=True)
+        return
+    db = get_db()
+    try:
+        async with db.service_types.watch() as stream:
+            async for _ in stream:
+                await asyncio.sleep(REBUILD_DELAY)
+                while await stream.try_next() is not None:
+                    pass
+                try:
+                    await rebuild()
+                except Exception:
+                    logger.warning("Local vector index rebuild failed", exc_info=True)
+    except Exception:
+        logger.warning("service_types change stream unavailable — local vector index will not refresh", exc_info=True)
+
+
+def search(query_vector: list[float], k: int = 10) -> list[tuple[str, str, float]]:
+    """Nearest service types as (slug, name, score).
+
+    Scores use Atlas' cosine scale, (1 + cos) / 2, so the same thresholds apply.
+    """
+    if _state is None:
+        return []
+    index, slugs, names = _state
+    vec = np.asarray([query_vector], dtype="float32")
+    faiss.normalize_L2(vec)
+    sims, ids = index.search(vec, min(k, len(slugs)))
+    return [
+        (slugs[i], names[i], (1.0 + float(s)) / 2.0)
+        for s, i in zip(sims[0], ids[0])
+        if i >= 0
+    ]
@@ -19,6 +19,19 @@ from app.services.embeddings import EMBEDDING_DIMENSIONS
 TEXT_INDEX_NAME = "service_types_text"
 VECTOR_INDEX_NAME = "service_types_vector"
 
+TEXT_INDEX_DEFINITION = {
+    "mappings": {
+        "dynamic": False,
+        "fields": {
+            "name": {"type": "string", "analyzer": "lucene.standard"},
+            "slug": {"type": "string", "analyzer": "lucene.standard"},
+            "category": {"type": "string", "analyzer": "lucene.standard"},
+        },
+    },
+    # Text matches are served from the index without loading the documents.
+    "storedSource": {"include": ["slug", "name"]},
+}
+
 
 def create_indexes():
     client = MongoClient(settings.mongo_url)
@@ -28,20 +41,14 @@ def create_indexes():
     existing = {idx["name"] for idx in collection.list_search_indexes()}
 
     if TEXT_INDEX_NAME in existing:
-        print(f"  ✓ Atlas Search index '{TEXT_INDEX_NAME}' already exists — skipping.")
+        # Keep older deployments in step with the definition (storedSource
+        # is required by the returnStoredSource queries in search.py).
+        print(f"  ✓ Atlas Search index '{TEXT_INDEX_NAME}' already exists — updating definition.")
+        collection.update_search_index(TEXT_INDEX_NAME, TEXT_INDEX_DEFINITION)
     else:
         print(f"  Creating Atlas Search index '{TEXT_INDEX_NAME}'...")
         text_index = SearchIndexModel(
-            definition={
-                "mappings": {
-                    "dynamic": False,
-                    "fields": {
-                        "name": {"type": "string", "analyzer": "lucene.standard"},
-                        "slug": {"type": "string", "analyzer": "lucene.standard"},
-                        "category": {"type": "string", "analyzer": "lucene.standard"},
-                    },
-                }
-            },
+            definition=TEXT_INDEX_DEFINITION,
             name=TEXT_INDEX_NAME,
             type="search",
         )
@@ -60,6 +67,7 @@ def create_indexes():
                         "path": "embedding",
                         "numDimensions": EMBEDDING_DIMENSIONS,
                         "similarity": "cosine",
+                        "quantization": "scalar",
                     }
                 ]
             },
@@ -10,12 +10,24 @@ Also generates embeddings if OPENAI_API_KEY is set.
 
 import asyncio
 import random
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import GEOSPHERE, IndexModel, InsertOne, WriteConcern
 
 from app.config import settings
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 random.seed(42)
 
 SERVICE_TYPES = [
@@ -69,97 +81,216 @@ PROVIDERS = [
 
 SOURCE_TYPES = ["scrape", "manual", "receipt", "quote"]
 
+OBSERVATION_COUNT = 150
+INSERT_CHUNK = 32
+# w=0 writes may still be in flight when the last insert returns.
+CONFIRM_ATTEMPTS = 20
+CONFIRM_INTERVAL = 0.25
+EMBED_CHUNK = 64
+EMBED_CONCURRENCY = 4
 
-async def seed():
-    client = AsyncIOMotorClient(settings.mongo_url)
-    db = client[settings.mongo_db]
 
-    print("Dropping existing collections...")
-    await db.service_types.drop()
-    await db.providers.drop()
-    await db.observations.drop()
+async def insert_chunked(collection, docs: list[dict]) -> list:
+    """Unordered InsertOne bulk writes in concurrent chunks; returns _ids in input order."""
+    chunks = [docs[i:i + INSERT_CHUNK] for i in range(0, len(docs), INSERT_CHUNK)]
+    await asyncio.gather(
+        *(collection.bulk_write([InsertOne(d) for d in chunk], ordered=False) for chunk in chunks)
+    )
+    # InsertOne assigns missing _ids on the documents themselves.
+    return [d["_id"] for d in docs]
 
-    now = datetime.now(timezone.utc)
 
-    # --- Generate embeddings if possible ---
-    embeddings_available = False
+def random_price(low: float, high: float) -> float:
+    """Uniform price in [low, high], drawn in whole pennies."""
+    return random.randrange(round(low * 100), round(high * 100) + 1) / 100
+
+
+def _unacknowledged(db, name: str):
+    """Fire-and-forget (w=0) handle for the bulk loads.
+
+    The collections were just dropped and the run can simply be repeated,
+    so there is nothing to gain from waiting for each batch's ack.
+    """
+    return db.get_collection(name, write_concern=WriteConcern(w=0))
+
+
+async def confirm_counts(db, **expected: int):
+    """Wait until the unacknowledged loads are visible; raise if any went missing.
+
+    Counts go through the default (acknowledged) write concern handles.
+    """
+    counts: dict[str, int] = {}
+    for _ in range(CONFIRM_ATTEMPTS):
+        counts = dict(zip(expected, await asyncio.gather(
+            *(db[name].count_documents({}) for name in expected)
+        )))
+        if counts == expected:
+            return
+        await asyncio.sleep(CONFIRM_INTERVAL)
+    raise RuntimeError(f"Seed writes did not all land: expected {expected}, found {counts}")
+
+
+async def create_indexes(db):
+    # location indexes are 2dsphere only: every reader uses $geoNear,
+    # $nearSphere (db.nearest_query) or $geoWithin + $centerSphere
+    # (db.near_query) with GeoJSON points. Legacy $center/$box/$polygon
+    # queries would need a 2d index and must not be added.
+    await asyncio.gather(
+        db.service_types.create_index("slug", unique=True),
+        db.providers.create_index([("location", GEOSPHERE)]),
+        # One createIndexes command for both observation indexes.
+        db.observations.create_indexes([
+            IndexModel([("category", 1), ("service_type", 1), ("location", GEOSPHERE)]),
+            IndexModel([("service_type", 1), ("observed_at", -1)]),
+        ]),
+    )
+
+
+async def embed_service_types(service_types: list[dict]) -> list[list[float]] | None:
+    """Embed the service types, if an API key is set.
+
+    Texts go out in chunks of EMBED_CHUNK, at most EMBED_CONCURRENCY at a time.
+    """
     try:
         from app.services.embeddings import build_search_text, get_embeddings, is_available
 
-        if is_available():
-            emb = get_embeddings()
-            texts = [
-                build_search_text(st["name"], st["category"], st.get("description"))
-                for st in SERVICE_TYPES
-            ]
-            vectors = emb.embed_documents(texts)
-            for st, vec in zip(SERVICE_TYPES, vectors):
-                st["embedding"] = vec
-            embeddings_available = True
-            print("Generated embeddings for service types.")
+        if not is_available():
+            return None
+        texts = [
+            build_search_text(st["name"], st["category"], st.get("description"))
+            for st in service_types
+        ]
+        emb = get_embeddings()
+        sem = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+        async def embed_chunk(chunk: list[str]) -> list[list[float]]:
+            async with sem:
+                return await emb.aembed_documents(chunk)
+
+        results = await asyncio.gather(
+            *(embed_chunk(texts[i:i + EMBED_CHUNK]) for i in range(0, len(texts), EMBED_CHUNK))
+        )
+        print("Generated embeddings for service types.")
+        return [vec for chunk in results for vec in chunk]
     except Exception as e:
         print(f"Skipping embeddings: {e}")
+        return None
+
+
+async def seed_dataset(
+    db,
+    service_types: list[dict],
+    providers: list[dict],
+    price_ranges: dict[str, tuple[float, float]],
+    n_observations: int,
+    city: str,
+):
+    """Replace all service types, providers and observations with a generated dataset."""
+    # The OpenAI round-trip overlaps the drops.
+    embed_task = asyncio.create_task(embed_service_types(service_types))
+
+    print("Dropping existing collections...")
+    await asyncio.gather(
+        db.service_types.drop(),
+        db.providers.drop(),
+        db.observations.drop(),
+    )
+
+    # The collections are empty now, so indexes build instantly and are
+    # then maintained by the inserts below.
+    index_task = asyncio.create_task(create_indexes(db))
+
+    now = datetime.now(timezone.utc)
+    vectors = await embed_task
+    embeddings_available = vectors is not None
 
-    print(f"Inserting {len(SERVICE_TYPES)} service types...")
-    for st in SERVICE_TYPES:
-        st["created_at"] = now
-    await db.service_types.insert_many(SERVICE_TYPES)
+    print(f"Inserting {len(service_types)} service types...")
+    # Fresh documents, so the dataset constants are never mutated (insert_many
+    # would also add _id to them).
+    service_type_docs = [{**st, "created_at": now} for st in service_types]
+    if vectors is not None:
+        for doc, vec in zip(service_type_docs, vectors):
+            doc["embedding"] = vec
+    await db.service_types.insert_many(service_type_docs)
 
-    print(f"Inserting {len(PROVIDERS)} providers...")
-    provider_docs = []
-    for p in PROVIDERS:
-        provider_docs.append({
+    print(f"Inserting {len(providers)} providers...")
+    provider_docs = [
+        {
             "name": p["name"],
             "category": p["category"],
             "address": p["address"],
-            "city": "London",
+            "city": city,
             "location": {"type": "Point", "coordinates": [p["lng"], p["lat"]]},
             "rating": p.get("rating"),
             "review_count": p.get("review_count"),
             "description": p.get("description"),
             "created_at": now,
-        })
-    result = await db.providers.insert_many(provider_docs)
-    provider_ids = result.inserted_ids
-
-    print("Generating ~150 observations...")
-    observations = []
-    for _ in range(150):
-        idx = random.randint(0, len(provider_docs) - 1)
-        provider = provider_docs[idx]
-        provider_id = provider_ids[idx]
-
-        service = random.choice(SERVICE_TYPES)
-        low, high = PRICE_RANGES[service["slug"]]
-        price = round(random.uniform(low, high), 2)
-
-        days_ago = random.randint(0, 90)
-        observed_at = now - timedelta(days=days_ago)
+        }
+        for p in providers
+    ]
+    provider_ids = await insert_chunked(_unacknowledged(db, "providers"), provider_docs)
 
-        observations.append({
+    print(f"Generating {n_observations} observations...")
+    # (provider _id, location, category); every observation shares its provider's location dict.
+    targets = [(pid, p["location"], p["category"]) for pid, p in zip(provider_ids, provider_docs)]
+    # Service types partitioned once, so each observation draws from its
+    # provider's category without scanning the whole list.
+    by_cat: dict[str, list[dict]] = defaultdict(list)
+    for st in service_types:
+        by_cat[st["category"]].append(st)
+    # One random.choices call per column where the population is shared.
+    picks = random.choices(targets, k=n_observations)
+    services = [random.choice(by_cat[category]) for _, _, category in picks]
+    sources = random.choices(SOURCE_TYPES, k=n_observations)
+    # 91 possible dates (today back to 90 days ago), built once and shared.
+    observed_ats = random.choices(
+        [now - timedelta(days=d) for d in range(91)], k=n_observations
+    )
+    observations = [
+        {
             "provider_id": provider_id,
             "service_type": service["slug"],
             "category": service["category"],
-            "price": price,
+            "price": random_price(*price_ranges[service["slug"]]),
             "currency": "GBP",
-            "source_type": random.choice(SOURCE_TYPES),
-            "location": provider["location"],
+            "source_type": source,
+            "location": location,
             "observed_at": observed_at,
             "created_at": now,
-        })
+        }
+        for (provider_id, location, _), service, source, observed_at in zip(
+            picks, services, sources, observed_ats
+        )
+    ]
 
-    await db.observations.insert_many(observations)
+    await insert_chunked(_unacknowledged(db, "observations"), observations)
 
-    from pymongo import GEOSPHERE
-    await db.service_types.create_index("slug", unique=True)
-    await db.providers.create_index([("location", GEOSPHERE)])
-    await db.observations.create_index([("location", GEOSPHERE)])
-    await db.observations.create_index([("category", 1), ("service_type", 1)])
+    await index_task
+    await confirm_counts(db, providers=len(provider_docs), observations=len(observations))
 
     embed_note = " (with embeddings)" if embeddings_available else " (no embeddings — run embed_service_types)"
-    print(f"Done! Seeded {len(SERVICE_TYPES)} service types, {len(PROVIDERS)} providers, {len(observations)} observations{embed_note}.")
+    print(f"Done! Seeded {len(service_types)} service types, {len(providers)} providers, {len(observations)} observations{embed_note}.")
+
+
+async def seed():
+    # Room for every concurrent insert chunk and index build. The bulk
+    # inserts repeat the same field names in every document, so they compress
+    # well; zstd needs the zstandard package, zlib is always available.
+    client = AsyncIOMotorClient(
+        settings.mongo_url,
+        maxPoolSize=32,
+        compressors="zstd,zlib" if zstandard is not None else "zlib",
+    )
+    # Pay for connection setup and auth before the timed work starts.
+    await client.admin.command("ping")
+    db = client[settings.mongo_db]
+    await seed_dataset(
+        db, SERVICE_TYPES, PROVIDERS, PRICE_RANGES, OBSERVATION_COUNT, city="London"
+    )
     client.close()
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(seed())
@@ -66,6 +66,29 @@ export function BookingModal({ provider, onClose }: BookingModalProps) {
     return () => clearInterval(interval);
   }, [status]);
 
+  // Resolves with the final status streamed by /api/book/{id}/events
+  function waitForBooking(bookingId: string, signal: AbortSignal): Promise<string> {
+    return new Promise((resolve, reject) => {
+      const events = new EventSource(`${API_URL}/api/book/${bookingId}/events`);
+      const close = () => events.close();
+      signal.addEventListener("abort", () => {
+        close();
+        reject(new Error("Timed out"));
+      });
+      events.onmessage = (e) => {
+        const { status } = JSON.parse(e.data);
+        if (status === "succeeded" || status === "failed" || status === "timeout") {
+          close();
+          resolve(status);
+        }
+      };
+      events.onerror = () => {
+        close();
+        reject(new Error("Event stream failed"));
+      };
+    });
+  }
+
   async function handleSubmit(e: React.FormEvent) {
     e.preventDefault();
     setStatus("loading");
@@ -80,7 +103,9 @@ export function BookingModal({ provider, onClose }: BookingModalProps) {
         signal: controller.signal,
       });
       if (!res.ok) throw new Error("Request failed");
-      setStatus("success");
+      const { booking_id } = await res.json();
+      const result = await waitForBooking(booking_id, controller.signal);
+      setStatus(result === "succeeded" ? "success" : "error");
     } catch {
       setStatus("error");
     } finally {